@@ -0,0 +1,103 @@
+"""
+Schedule renderer benchmark
+Checks that rendering and splitting scale linearly with the number of events
+
+Run from the repository root:
+    python benchmarks/bench_renderer.py
+"""
+
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from time import perf_counter
+import pytz
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'bot'))
+
+from services.calendar_event import CalendarEvent
+from services.schedule_renderer import ScheduleRenderer
+
+SIZES = [10, 100, 1000, 5000, 10000]
+DAYS = 30
+
+def make_groups(count: int) -> list:
+    """Synthetic (date, events) groups spread over DAYS days"""
+    start = date(2025, 1, 1)
+    groups = []
+    for day in range(DAYS):
+        start_time = datetime(2025, 1, 1, 9, tzinfo=pytz.UTC) + timedelta(days=day)
+        events = [
+            CalendarEvent(
+                f'event{index}',
+                '',
+                f'Event {index}',
+                'Room 101' if index % 2 else '',
+                'Quarterly planning session ' * (index % 6),
+                start_time,
+                start_time + timedelta(hours=1),
+                pytz.UTC
+            )
+            for index in range(day, count, DAYS)
+        ]
+        if events:
+            groups.append((start + timedelta(days=day), events))
+    return groups
+
+def legacy_render(groups) -> list[str]:
+    """Previous approach: string += rendering, then a rebuild-per-line split"""
+    schedule_text = ""
+    current_date = None
+    for event_date, events in groups:
+        for event in events:
+            if current_date != event_date:
+                current_date = event_date
+                schedule_text += f"\n**{event_date.strftime('%Y-%m-%d (%A)')}**\n"
+            schedule_text += f"🕐 **{event.time}** - {event.title}\n"
+            if event.location:
+                schedule_text += f"📍 {event.location}\n"
+            if event.description:
+                desc = event.description[:100] + "..." if len(event.description) > 100 else event.description
+                schedule_text += f"📝 {desc}\n"
+            schedule_text += "\n"
+    
+    chunks = []
+    current_chunk = ""
+    for line in schedule_text.split('\n'):
+        if len(current_chunk + line + '\n') > 4000:
+            if current_chunk:
+                chunks.append(current_chunk.strip())
+            current_chunk = line + '\n'
+        else:
+            current_chunk += line + '\n'
+    if current_chunk.strip():
+        chunks.append(current_chunk.strip())
+    return chunks
+
+def render(groups) -> list:
+    """Shared single-pass renderer"""
+    renderer = ScheduleRenderer("📅 Upcoming Events", show_dates=True)
+    renderer.add_groups(groups)
+    return renderer.finish()
+
+def best_of(func, groups, repeat: int = 5) -> float:
+    """Best wall time in seconds over several runs"""
+    timings = []
+    for _ in range(repeat):
+        started = perf_counter()
+        func(groups)
+        timings.append(perf_counter() - started)
+    return min(timings)
+
+def main():
+    print(f"{'events':>8} {'messages':>9} {'legacy msgs':>12} {'renderer ms':>12} {'us/event':>9} {'legacy ms':>10}")
+    for size in SIZES:
+        groups = make_groups(size)
+        messages = render(groups)
+        legacy_chunks = legacy_render(groups)
+        renderer_time = best_of(render, groups)
+        legacy_time = best_of(legacy_render, groups)
+        print(f"{size:>8} {len(messages):>9} {len(legacy_chunks):>12} {renderer_time * 1000:>12.2f} "
+              f"{renderer_time / size * 1e6:>9.2f} {legacy_time * 1000:>10.2f}")
+
+if __name__ == '__main__':
+    main()
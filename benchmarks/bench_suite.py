@@ -0,0 +1,235 @@
+"""
+Offline benchmark suite
+Times event parsing, grouping, rendering and splitting, scheduler ticks and end-to-end
+schedule commands against a local Calendar API stand-in and fake Discord channels
+
+Run from the repository root:
+    python benchmarks/bench_suite.py                 # run, save and compare with the previous run
+    python benchmarks/bench_suite.py --quick         # smaller sizes
+    python benchmarks/bench_suite.py --compare benchmarks/results/<run>.json
+
+Results are saved as JSON under benchmarks/results/ so runs can be compared.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / 'bot'))
+sys.path.insert(0, str(ROOT))
+
+# Configure the services before they are imported
+os.environ.update({
+    'TIMEZONE': 'Asia/Seoul',
+    'GOOGLE_API_KEY': 'benchmark',
+    'GOOGLE_CALENDAR_ID': 'benchmark@example.com',
+    'FANOUT_RATE': '100000',
+})
+os.environ.pop('GOOGLE_CALENDAR_IDS', None)
+
+from fakes import FakeBot, FakeCalendarServer, FakeChannel, make_events
+from services.calendar_client import CalendarApiClient
+from services.calendar_service import GoogleCalendarService
+from services.calendar_tasks import CalendarTasks
+from services.schedule_renderer import ScheduleRenderer
+from services.scheduler_service import SchedulerService
+
+RESULTS_DIR = ROOT / 'results'
+EVENT_SIZES = [10, 1000, 10000]
+QUICK_EVENT_SIZES = [10, 1000]
+TASK_SIZES = [100, 1000, 10000]
+QUICK_TASK_SIZES = [100, 1000]
+
+def best_of(func, repeat: int = 5) -> float:
+    """Best wall time in milliseconds over several runs"""
+    timings = []
+    for _ in range(repeat):
+        started = perf_counter()
+        func()
+        timings.append(perf_counter() - started)
+    return min(timings) * 1000
+
+async def median_of(coroutine_factory, repeat: int = 5) -> float:
+    """Median wall time in milliseconds of an async call over several runs"""
+    timings = []
+    for _ in range(repeat):
+        started = perf_counter()
+        await coroutine_factory()
+        timings.append(perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+def entries_for(service: GoogleCalendarService, events: list[dict]) -> list[tuple]:
+    """(date, start, label, event) entries as the service merges them"""
+    source = service.sources[0]
+    return [(day, start, source.label, event) for day, start, event in source.by_start_day(events)]
+
+def bench_formatting(results: dict, sizes: list[int]):
+    """Event parsing (once, on sync), grouping by day and rendering/splitting into messages"""
+    service = GoogleCalendarService()
+    for size in sizes:
+        events = make_events(size, days=7)
+        entries = entries_for(service, events)
+        groups = service._group_by_day(entries)
+        
+        def render():
+            renderer = ScheduleRenderer("📅 Upcoming Events", show_dates=True)
+            renderer.add_groups(groups)
+            return renderer.finish()
+        
+        results[f'parse/{size}'] = best_of(lambda: entries_for(service, events))
+        results[f'format/{size}'] = best_of(lambda: service._group_by_day(entries))
+        results[f'render/{size}'] = best_of(render)
+        print(f"  {size:>6} events: parse {results[f'parse/{size}']:8.2f} ms, "
+              f"group {results[f'format/{size}']:8.2f} ms, "
+              f"render+split {results[f'render/{size}']:8.2f} ms ({len(render())} messages)")
+
+async def scheduler_run(size: int, func) -> tuple[float, float]:
+    """Schedule `size` daily tasks, then run all of them in one tick; both times in milliseconds"""
+    scheduler = SchedulerService(FakeBot())
+    for index in range(size):
+        scheduler.add_task(f'task{index}', func, hour=index % 24, minute=index % 60)
+    
+    started = perf_counter()
+    scheduler.start_all()
+    schedule_ms = (perf_counter() - started) * 1000
+    
+    # Jump the clock to the last fire time and let the engine run every task in one tick
+    future = max(task.next_run for task in scheduler.tasks.values())
+    scheduler._now = lambda: future
+    await asyncio.sleep(0)
+    started = perf_counter()
+    scheduler._wakeup.set()
+    while scheduler._heap and scheduler._heap[0][0] <= future:
+        await asyncio.sleep(0)
+    await asyncio.gather(*scheduler._jobs)
+    tick_ms = (perf_counter() - started) * 1000
+    
+    engine = scheduler._engine
+    scheduler.stop_all()
+    await asyncio.gather(engine, return_exceptions=True)
+    return schedule_ms, tick_ms
+
+async def bench_scheduler(results: dict, sizes: list[int]):
+    """Cost of scheduling many tasks and of one engine tick that runs all of them (best of 3)"""
+    async def noop(channels):
+        return None
+    
+    for size in sizes:
+        schedule_ms, tick_ms = await scheduler_run(size, noop)
+        for _ in range(2):
+            schedule_run_ms, tick_run_ms = await scheduler_run(size, noop)
+            schedule_ms, tick_ms = min(schedule_ms, schedule_run_ms), min(tick_ms, tick_run_ms)
+        
+        results[f'scheduler_schedule/{size}'] = schedule_ms
+        results[f'scheduler_tick/{size}'] = tick_ms
+        print(f"  {size:>6} tasks: schedule {schedule_ms:8.2f} ms ({schedule_ms / size * 1000:.1f} us/task), "
+              f"tick {tick_ms:8.2f} ms ({tick_ms / size * 1000:.1f} us/task)")
+
+async def bench_end_to_end(results: dict, sizes: list[int]):
+    """send_manual_schedule against the fake Calendar API, cold (full sync) and warm (in memory)"""
+    for size in sizes:
+        server = FakeCalendarServer(make_events(size, days=7))
+        url = await server.start()
+        
+        service = GoogleCalendarService()
+        service.client = CalendarApiClient(service.api_key, base_url=url)
+        calendar_tasks = CalendarTasks(service)
+        
+        try:
+            channel = FakeChannel()
+            started = perf_counter()
+            await calendar_tasks.send_manual_schedule(channel, days=7)
+            cold_ms = (perf_counter() - started) * 1000
+            first_message_ms = (channel.send_times[0] - started) * 1000
+            
+            today_ms = await median_of(lambda: calendar_tasks.send_manual_schedule(FakeChannel(), days=0))
+            week_ms = await median_of(lambda: calendar_tasks.send_manual_schedule(FakeChannel(), days=7))
+        finally:
+            await service.close()
+            await server.stop()
+        
+        results[f'e2e_cold_week/{size}'] = cold_ms
+        results[f'e2e_cold_first_message/{size}'] = first_message_ms
+        results[f'e2e_today/{size}'] = today_ms
+        results[f'e2e_week/{size}'] = week_ms
+        print(f"  {size:>6} events: cold week {cold_ms:8.2f} ms (first message {first_message_ms:.2f} ms), "
+              f"warm today {today_ms:8.2f} ms, warm week {week_ms:8.2f} ms, {server.requests} API requests")
+
+def latest_result(exclude: Path | None = None) -> Path | None:
+    """Most recent saved run"""
+    runs = sorted(path for path in RESULTS_DIR.glob('*.json') if path != exclude)
+    return runs[-1] if runs else None
+
+def compare(current: dict, baseline_path: Path, threshold: float) -> int:
+    """Print the change against a baseline run and return the number of regressions"""
+    baseline = json.loads(baseline_path.read_text())['results']
+    print(f"\nCompared with {baseline_path.name} (regression threshold {threshold:.0%}):")
+    print(f"  {'benchmark':<32} {'baseline ms':>12} {'current ms':>12} {'change':>8}")
+    
+    regressions = 0
+    for name, value in current.items():
+        if name not in baseline:
+            continue
+        previous = baseline[name]
+        change = (value - previous) / previous if previous else 0.0
+        flag = ''
+        # Sub-0.1 ms differences are timer noise, whatever the ratio
+        if change > threshold and value - previous > 0.1:
+            flag = '  ⚠️ slower'
+            regressions += 1
+        print(f"  {name:<32} {previous:>12.2f} {value:>12.2f} {change:>+8.0%}{flag}")
+    return regressions
+
+async def run(args) -> dict:
+    """Run every benchmark group and collect results in milliseconds"""
+    results = {}
+    event_sizes = QUICK_EVENT_SIZES if args.quick else EVENT_SIZES
+    task_sizes = QUICK_TASK_SIZES if args.quick else TASK_SIZES
+    
+    print("Formatting and rendering:")
+    bench_formatting(results, event_sizes)
+    print("Scheduler:")
+    await bench_scheduler(results, task_sizes)
+    print("End-to-end send_manual_schedule:")
+    await bench_end_to_end(results, event_sizes)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='smaller sizes for a fast check')
+    parser.add_argument('--compare', type=Path, help='baseline results file (default: previous run)')
+    parser.add_argument('--threshold', type=float, default=0.2, help='relative slowdown reported as a regression')
+    parser.add_argument('--no-save', action='store_true', help='do not store this run')
+    args = parser.parse_args()
+    
+    results = asyncio.run(run(args))
+    
+    saved = None
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        saved = RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        saved.write_text(json.dumps({
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'quick': args.quick,
+            'results': results,
+        }, indent=2))
+        print(f"\nSaved results to {saved.relative_to(ROOT.parent)}")
+    
+    baseline = args.compare or latest_result(exclude=saved)
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
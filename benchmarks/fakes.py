@@ -0,0 +1,123 @@
+"""
+Offline stand-ins for benchmarks
+A local Calendar v3 events.list server and Discord objects that record what is sent
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from time import perf_counter
+from aiohttp import web
+import pytz
+
+TIMEZONE = pytz.timezone('Asia/Seoul')
+
+def make_events(count: int, days: int = 1, start: datetime | None = None) -> list[dict]:
+    """Synthetic Calendar API events spread evenly over `days` days from today, ordered by start"""
+    start = start or datetime.now(TIMEZONE).replace(hour=0, minute=0, second=0, microsecond=0)
+    span = timedelta(days=days)
+    events = []
+    for index in range(count):
+        event_start = start + span * index / max(count, 1)
+        events.append({
+            'id': f'event{index}',
+            'status': 'confirmed',
+            'summary': f'Event {index}',
+            'location': 'Room 101' if index % 2 else '',
+            'description': 'Quarterly planning session ' * (index % 6),
+            'start': {'dateTime': event_start.isoformat()},
+            'end': {'dateTime': (event_start + timedelta(hours=1)).isoformat()},
+        })
+    return events
+
+class FakeCalendarServer:
+    """
+    Serves GET /calendars/{id}/events like Calendar v3 on a local port
+    
+    Supports maxResults/pageToken paging, timeMin/timeMax filtering and
+    syncToken requests (answered with an empty change set). An optional
+    per-request latency simulates the network.
+    """
+    
+    def __init__(self, events: list[dict], latency: float = 0.0):
+        self.events = events
+        self.latency = latency
+        self.requests = 0
+        self.url = ''
+        self._runner: web.AppRunner | None = None
+    
+    async def start(self) -> str:
+        """Start listening on a free localhost port and return the base URL"""
+        app = web.Application()
+        app.router.add_get('/calendars/{calendar_id}/events', self._list_events)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f'http://127.0.0.1:{port}'
+        return self.url
+    
+    async def stop(self):
+        """Shut the server down"""
+        if self._runner:
+            await self._runner.cleanup()
+    
+    async def _list_events(self, request: web.Request) -> web.Response:
+        """One page of events.list"""
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        
+        query = request.query
+        if 'syncToken' in query:
+            return web.json_response({'items': [], 'nextSyncToken': query['syncToken']})
+        
+        events = self.events
+        if 'timeMin' in query or 'timeMax' in query:
+            time_min = datetime.fromisoformat(query['timeMin']) if 'timeMin' in query else None
+            time_max = datetime.fromisoformat(query['timeMax']) if 'timeMax' in query else None
+            events = [
+                event for event in events
+                if (time_min is None or datetime.fromisoformat(event['end']['dateTime']) > time_min)
+                and (time_max is None or datetime.fromisoformat(event['start']['dateTime']) < time_max)
+            ]
+        
+        offset = int(query.get('pageToken', 0))
+        page_size = int(query.get('maxResults', 250))
+        page = {'items': events[offset:offset + page_size]}
+        if offset + page_size < len(events):
+            page['nextPageToken'] = str(offset + page_size)
+        else:
+            page['nextSyncToken'] = 'sync-token'
+        return web.json_response(page)
+
+class FakeChannel:
+    """Discord channel that records sent payloads, with optional send latency"""
+    
+    def __init__(self, channel_id: int = 1, latency: float = 0.0):
+        self.id = channel_id
+        self.latency = latency
+        self.sent: list[dict] = []
+        self.send_times: list[float] = []
+        self.mention = f'<#{channel_id}>'
+    
+    async def send(self, content=None, **kwargs):
+        """Record a message instead of sending it"""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.sent.append({'content': content, **kwargs})
+        self.send_times.append(perf_counter())
+
+class FakeBot:
+    """Just enough of commands.Bot for SchedulerService"""
+    
+    def __init__(self, channels: dict[int, FakeChannel] | None = None):
+        self.channels = channels or {}
+    
+    async def wait_until_ready(self):
+        """Always ready"""
+        return None
+    
+    def get_channel(self, channel_id: int):
+        """Look up a fake channel by id"""
+        return self.channels.get(channel_id)
@@ -0,0 +1,259 @@
+"""
+Synthetic command load generator
+Injects !today/!week style messages through bot.process_commands against stubbed
+Discord objects and a local Calendar API stand-in, and reports throughput,
+command latency percentiles and event-loop lag
+
+Run from the repository root:
+    python benchmarks/load_test.py --rate 200 --concurrency 50 --duration 10
+    python benchmarks/load_test.py --mix today=0.7,week=0.3 --guilds 500 --api-latency 0.05
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+from itertools import count
+from pathlib import Path
+from random import Random
+from time import perf_counter
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / 'bot'))
+sys.path.insert(0, str(ROOT))
+
+# Configure the services before they are imported
+os.environ.update({
+    'TIMEZONE': 'Asia/Seoul',
+    'GOOGLE_API_KEY': 'load-test',
+    'GOOGLE_CALENDAR_ID': 'load-test@example.com',
+    'COMMAND_PREFIX': '!',
+})
+os.environ.pop('GOOGLE_CALENDAR_IDS', None)
+# Synthetic users and guilds would trip the per-bucket limits; the concurrency cap still applies
+for scope in ('USER', 'CHANNEL', 'GUILD'):
+    os.environ.setdefault(f'ADMISSION_{scope}_LIMIT', '0')
+
+import discord
+from discord.ext import commands
+from fakes import FakeCalendarServer, FakeChannel, make_events
+from services.calendar_client import CalendarApiClient
+from services.calendar_service import GoogleCalendarService
+from utils.metrics import registry
+
+COMMAND_TEXT = {
+    'today': '!today',
+    'week': '!week',
+    'upcoming': '!upcoming 3',
+}
+
+class FakeUser:
+    """Message author with the attributes commands read"""
+    
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.bot = False
+        self.roles = []
+        self.mention = f'<@{user_id}>'
+    
+    def __str__(self):
+        return f'user{self.id}'
+
+class FakeGuild:
+    """Guild with an id, as seen through ctx.guild"""
+    
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+
+class FakeMessage:
+    """The subset of discord.Message that get_context and the cogs use"""
+    
+    _ids = count(1)
+    
+    def __init__(self, content: str, author: FakeUser, channel: FakeChannel, guild: FakeGuild):
+        self.id = next(self._ids)
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = guild
+        self.attachments = []
+        self._state = None
+
+class LoadContext(commands.Context):
+    """Context whose replies go to the fake channel instead of the Discord API"""
+    
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+class LoadBot(commands.Bot):
+    """commands.Bot that never connects: contexts are built from fake messages"""
+    
+    BOT_USER = FakeUser(0)
+    
+    @property
+    def user(self):
+        return self.BOT_USER
+    
+    async def get_context(self, origin, *, cls=LoadContext):
+        return await super().get_context(origin, cls=cls)
+
+async def build_bot(calendar_url: str) -> LoadBot:
+    """A bot with the real calendar cog wired to the fake Calendar API"""
+    bot = LoadBot(command_prefix='!', intents=discord.Intents.default(), help_command=None)
+    # What login() would do: bind the loop, so events such as command errors can be dispatched
+    await bot._async_setup_hook()
+    bot.calendar_service = GoogleCalendarService()
+    bot.calendar_service.client = CalendarApiClient(bot.calendar_service.api_key, base_url=calendar_url)
+    await bot.load_extension('commands.calendar')
+    return bot
+
+async def monitor_loop_lag(lags: list[float], stop: asyncio.Event, interval: float = 0.01):
+    """Measure how late a periodic timer fires: the event loop's scheduling lag"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+def parse_mix(value: str) -> list[tuple[str, float]]:
+    """'today=0.7,week=0.3' -> [(command, weight)]"""
+    mix = []
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in COMMAND_TEXT:
+            raise argparse.ArgumentTypeError(f"Unknown command '{name}', choose from {', '.join(COMMAND_TEXT)}")
+        mix.append((name.strip(), float(weight or 1)))
+    return mix
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of unsorted values"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+async def run(args) -> dict:
+    """Drive the bot at the requested rate and collect latency and lag samples"""
+    server = FakeCalendarServer(make_events(args.events, days=7), latency=args.api_latency)
+    bot = await build_bot(await server.start())
+    
+    rng = Random(args.seed)
+    names = [name for name, _ in args.mix]
+    weights = [weight for _, weight in args.mix]
+    channels = [FakeChannel(1000 + index, latency=args.send_latency) for index in range(args.guilds)]
+    guilds = [FakeGuild(index + 1) for index in range(args.guilds)]
+    
+    latencies: dict[str, list[float]] = {name: [] for name in names}
+    errors = 0
+    
+    # Command errors are dispatched to on_command_error rather than raised
+    async def count_error(ctx, error):
+        nonlocal errors
+        errors += 1
+    bot.add_listener(count_error, 'on_command_error')
+    lags: list[float] = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_loop_lag(lags, stop))
+    slots = asyncio.Semaphore(args.concurrency)
+    in_flight: set[asyncio.Task] = set()
+    
+    async def inject(name: str, message: FakeMessage):
+        nonlocal errors
+        started = perf_counter()
+        try:
+            await bot.process_commands(message)
+            latencies[name].append(perf_counter() - started)
+        except Exception:
+            errors += 1
+        finally:
+            slots.release()
+    
+    # Open-loop arrivals at the target rate; the concurrency cap applies back-pressure
+    offered = 0
+    started = perf_counter()
+    deadline = started + args.duration
+    interval = 1 / args.rate
+    next_arrival = started
+    while next_arrival < deadline:
+        delay = next_arrival - perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await slots.acquire()
+        
+        guild_index = rng.randrange(args.guilds)
+        name = rng.choices(names, weights)[0]
+        message = FakeMessage(COMMAND_TEXT[name], FakeUser(rng.randrange(1, 10**6)),
+                              channels[guild_index], guilds[guild_index])
+        task = asyncio.create_task(inject(name, message))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+        offered += 1
+        next_arrival += interval
+    
+    await asyncio.gather(*in_flight)
+    elapsed = perf_counter() - started
+    stop.set()
+    await monitor
+    
+    await bot.calendar_service.close()
+    await server.stop()
+    
+    completed = sum(len(values) for values in latencies.values())
+    return {
+        'offered': offered,
+        'completed': completed,
+        'errors': errors,
+        'elapsed': elapsed,
+        'latencies': latencies,
+        'lags': lags,
+        'api_requests': server.requests,
+        'messages_sent': sum(len(channel.sent) for channel in channels),
+    }
+
+def report(args, result: dict):
+    """Print throughput, latency percentiles per command and event-loop lag"""
+    print(f"Target {args.rate:g} msg/s for {args.duration:g}s, concurrency {args.concurrency}, "
+          f"{args.guilds} guilds, {args.events} calendar events")
+    print(f"Offered {result['offered']} commands, completed {result['completed']}, errors {result['errors']} "
+          f"in {result['elapsed']:.2f}s -> {result['completed'] / result['elapsed']:.1f} commands/s")
+    print(f"Calendar API requests: {result['api_requests']}, Discord messages sent: {result['messages_sent']}")
+    
+    print(f"\n  {'command':<10} {'count':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    all_latencies = []
+    for name, values in result['latencies'].items():
+        if not values:
+            continue
+        all_latencies.extend(values)
+        print(f"  {name:<10} {len(values):>7} {percentile(values, 0.5) * 1000:>9.2f} "
+              f"{percentile(values, 0.99) * 1000:>9.2f} {max(values) * 1000:>9.2f}")
+    if all_latencies:
+        print(f"  {'all':<10} {len(all_latencies):>7} {percentile(all_latencies, 0.5) * 1000:>9.2f} "
+              f"{percentile(all_latencies, 0.99) * 1000:>9.2f} {max(all_latencies) * 1000:>9.2f}")
+    
+    admissions = registry.counter('admission_requests_total')
+    if admissions.values:
+        outcomes = ', '.join(f"{dict(key)['result']} {value:g}" for key, value in sorted(admissions.values.items()))
+        print(f"\nAdmission: {outcomes}")
+    
+    lags = result['lags']
+    if lags:
+        print(f"\nEvent-loop lag: mean {statistics.mean(lags) * 1000:.2f} ms, p50 {percentile(lags, 0.5) * 1000:.2f} ms, "
+              f"p99 {percentile(lags, 0.99) * 1000:.2f} ms, max {max(lags) * 1000:.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rate', type=float, default=100, help='commands injected per second')
+    parser.add_argument('--concurrency', type=int, default=50, help='maximum commands in flight')
+    parser.add_argument('--duration', type=float, default=10, help='seconds to generate load for')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('today=0.7,week=0.3'),
+                        help='weighted command mix, e.g. today=0.7,week=0.2,upcoming=0.1')
+    parser.add_argument('--guilds', type=int, default=100, help='distinct guilds/channels sending commands')
+    parser.add_argument('--events', type=int, default=200, help='events in the fake calendar (spread over 7 days)')
+    parser.add_argument('--api-latency', type=float, default=0.0, help='simulated Calendar API latency in seconds')
+    parser.add_argument('--send-latency', type=float, default=0.0, help='simulated Discord send latency in seconds')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for the command mix')
+    args = parser.parse_args()
+    
+    report(args, asyncio.run(run(args)))
+
+if __name__ == '__main__':
+    main()
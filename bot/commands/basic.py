@@ -1,5 +1,9 @@
 import discord
 from discord.ext import commands
+from dotenv import load_dotenv
+from utils.authorization import get_authorizer
+from utils.decorators import authorized_only
+from utils.metrics import registry
 
 class BasicCommands(commands.Cog):
     """Basic utility commands"""
@@ -23,6 +27,95 @@ class BasicCommands(commands.Cog):
         """Get your Discord user ID"""
         await ctx.send(f'Your Discord ID is: `{ctx.author.id}`')
     
+    @commands.command(name='auth_reload')
+    @authorized_only()
+    async def auth_reload(self, ctx):
+        """Reload authorized users and roles from .env and the authorization file"""
+        load_dotenv(override=True)
+        authorizer = getattr(self.bot, 'authorizer', None) or get_authorizer()
+        index = authorizer.reload()
+        
+        embed = discord.Embed(
+            title="🔐 Authorization Reloaded",
+            description=f"**Users:** {len(index.users)}\n**Roles:** {len(index.roles)}\n**Guild overrides:** {len(index.guilds)}",
+            color=discord.Color.green()
+        )
+        await ctx.send(embed=embed)
+    
+    @commands.command(name='stats')
+    @authorized_only()
+    async def stats(self, ctx):
+        """Show command, calendar, scheduler and Discord send metrics"""
+        embed = discord.Embed(title="📈 Bot Stats", color=discord.Color.blue())
+        
+        commands_total = registry.counter('bot_commands_total')
+        embed.add_field(
+            name="Commands",
+            value=f"**Invoked:** {commands_total.total():g}\n"
+                  f"**Errors:** {registry.counter('bot_command_errors_total').total():g}\n"
+                  f"**Latency:** {self._latency(registry.histogram('bot_command_seconds'))}",
+            inline=False
+        )
+        
+        syncs = registry.counter('calendar_sync_total')
+        hits = sum(value for key, value in syncs.values.items() if ('result', 'fresh') in key)
+        total = syncs.total()
+        hit_rate = f"{hits / total:.0%}" if total else "n/a"
+        renders = registry.counter('render_cache_requests_total')
+        render_hits = sum(value for key, value in renders.values.items() if ('result', 'hit') in key)
+        render_rate = f"{render_hits / renders.total():.0%}" if renders.total() else "n/a"
+        api = registry.histogram('calendar_api_request_seconds')
+        embed.add_field(
+            name="Calendar",
+            value=f"**Cache hit rate:** {hit_rate} of {total:g} syncs\n"
+                  f"**Render cache hit rate:** {render_rate} of {renders.total():g} views\n"
+                  f"**API requests:** {api.count()} "
+                  f"({registry.counter('singleflight_shared_total').total():g} saved by coalescing)\n"
+                  f"**API latency:** {self._latency(api)}\n"
+                  f"**Retries:** {registry.counter('calendar_api_retries_total').total():g}, "
+                  f"**Circuit:** {'open' if registry.gauge('calendar_api_circuit_open').total() else 'closed'}",
+            inline=False
+        )
+        
+        admissions = registry.counter('admission_requests_total')
+        outcomes = {}
+        for key, value in admissions.values.items():
+            result = dict(key)['result']
+            outcomes[result] = outcomes.get(result, 0) + value
+        embed.add_field(
+            name="Admission",
+            value=f"**Admitted:** {outcomes.get('admitted', 0):g} (+{outcomes.get('queued', 0):g} after queueing)\n"
+                  f"**Rate limited:** {outcomes.get('rate_limited', 0):g}\n"
+                  f"**Rejected:** {outcomes.get('rejected', 0) + outcomes.get('timed_out', 0):g}\n"
+                  f"**Queue wait:** {self._latency(registry.histogram('admission_queue_wait_seconds'))}",
+            inline=False
+        )
+        
+        embed.add_field(
+            name="Scheduler",
+            value=f"**Fire delay:** {self._latency(registry.histogram('scheduler_fire_delay_seconds'), phase='fire')}\n"
+                  f"**Task errors:** {registry.counter('scheduler_task_errors_total').total():g}",
+            inline=False
+        )
+        
+        embed.add_field(
+            name="Discord",
+            value=f"**Send latency:** {self._latency(registry.histogram('discord_send_seconds'))}\n"
+                  f"**Send failures:** {registry.counter('discord_send_failures_total').total():g}",
+            inline=False
+        )
+        
+        await ctx.send(embed=embed)
+    
+    @staticmethod
+    def _latency(histogram, **labels) -> str:
+        """p50/p95 summary of a latency histogram"""
+        if not histogram.count(**labels):
+            return "no data"
+        p50 = histogram.quantile(0.5, **labels)
+        p95 = histogram.quantile(0.95, **labels)
+        return f"p50 ≤ {p50 * 1000:g}ms, p95 ≤ {p95 * 1000:g}ms"
+    
     @commands.command(name='help')
     async def help_command(self, ctx):
         """Show available commands"""
@@ -1,28 +1,32 @@
 import discord
 from discord.ext import commands
+import os
 import sys
 sys.path.append('..')
 from services.calendar_tasks import CalendarTasks
-from utils.decorators import authorized_only, require_bot_attribute
+from utils.decorators import admission_controlled, authorized_only, require_bot_attribute
 
 class CalendarCommands(commands.Cog):
     """Calendar-related commands"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.calendar_tasks = CalendarTasks()
+        self.calendar_tasks = CalendarTasks(getattr(bot, 'calendar_service', None))
     
     @commands.command(name='today')
+    @admission_controlled()
     async def today_schedule(self, ctx):
         """Show today's schedule"""
         await self.calendar_tasks.send_manual_schedule(ctx.channel, days=0)
     
     @commands.command(name='week')
+    @admission_controlled()
     async def week_schedule(self, ctx):
         """Show this week's schedule"""
         await self.calendar_tasks.send_manual_schedule(ctx.channel, days=7)
     
     @commands.command(name='upcoming')
+    @admission_controlled()
     async def upcoming_schedule(self, ctx, days: int = 3):
         """Show upcoming events for specified days (default: 3)"""
         if days < 1 or days > 30:
@@ -38,7 +42,8 @@ class CalendarCommands(commands.Cog):
         """Set the channel for daily schedule notifications"""
         target_channel = channel or ctx.channel
         
-        self.bot.scheduler.set_notification_channel('daily_calendar', target_channel.id)
+        guild_id = target_channel.guild.id if getattr(target_channel, 'guild', None) else None
+        self.bot.scheduler.set_notification_channel('daily_calendar', target_channel.id, guild_id)
         
         embed = discord.Embed(
             title="✅ Schedule Channel Set",
@@ -56,7 +61,7 @@ class CalendarCommands(commands.Cog):
             await ctx.send("❌ Invalid time format. Hour: 0-23, Minute: 0-59")
             return
         
-        success = self.bot.scheduler.update_task_time('daily_calendar', hour, minute)
+        success = self.bot.scheduler.update_task_time('daily_calendar', hour, minute, ctx.guild.id if ctx.guild else None)
         
         if success:
             embed = discord.Embed(
@@ -78,8 +83,7 @@ class CalendarCommands(commands.Cog):
     async def schedule_status(self, ctx):
         """Show current schedule settings and status"""
         
-        tasks = self.bot.scheduler.list_tasks()
-        calendar_task = next((task for task in tasks if task['name'] == 'daily_calendar'), None)
+        calendar_task = self.bot.scheduler.get_task('daily_calendar', ctx.guild.id if ctx.guild else None)
         
         embed = discord.Embed(
             title="📊 Schedule Status",
@@ -92,7 +96,7 @@ class CalendarCommands(commands.Cog):
             
             embed.add_field(
                 name="Daily Calendar Notification",
-                value=f"**Status:** {status} ({running})\n**Time:** {calendar_task['time']}\n**Channel:** <#{calendar_task['channel_id']}>" if calendar_task['channel_id'] else "**Channel:** Not set",
+                value=f"**Status:** {status} ({running})\n**Time:** {calendar_task['time']} ({calendar_task['timezone']})\n**Channel:** <#{calendar_task['channel_id']}>" if calendar_task['channel_id'] else "**Channel:** Not set",
                 inline=False
             )
         else:
@@ -120,7 +124,7 @@ class CalendarCommands(commands.Cog):
     async def enable_schedule(self, ctx):
         """Enable daily schedule notifications"""
         if hasattr(self.bot, 'scheduler'):
-            self.bot.scheduler.start_task('daily_calendar')
+            self.bot.scheduler.start_task('daily_calendar', ctx.guild.id if ctx.guild else None)
             
             embed = discord.Embed(
                 title="✅ Schedule Enabled",
@@ -136,7 +140,7 @@ class CalendarCommands(commands.Cog):
     async def disable_schedule(self, ctx):
         """Disable daily schedule notifications"""
         if hasattr(self.bot, 'scheduler'):
-            self.bot.scheduler.stop_task('daily_calendar')
+            self.bot.scheduler.stop_task('daily_calendar', ctx.guild.id if ctx.guild else None)
             
             embed = discord.Embed(
                 title="⏸️ Schedule Disabled",
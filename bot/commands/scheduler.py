@@ -1,5 +1,6 @@
 import discord
 from discord.ext import commands
+from services.schedule_renderer import continued_title, pack_fields
 from utils.decorators import authorized_only, require_bot_attribute
 
 class SchedulerCommands(commands.Cog):
@@ -13,7 +14,7 @@ class SchedulerCommands(commands.Cog):
     async def list_schedules(self, ctx):
         """List all scheduled tasks and their status"""
         
-        tasks = self.bot.scheduler.list_tasks()
+        tasks = self.bot.scheduler.list_tasks(ctx.guild.id if ctx.guild else None)
         
         if not tasks:
             embed = discord.Embed(
@@ -24,16 +25,12 @@ class SchedulerCommands(commands.Cog):
             await ctx.send(embed=embed)
             return
         
-        embed = discord.Embed(
-            title="📋 Scheduled Tasks",
-            color=discord.Color.blue()
-        )
-        
+        fields = []
         for task in tasks:
             status_icon = "🟢" if task['enabled'] else "🔴"
             running_icon = "▶️" if task['running'] else "⏸️"
             
-            field_value = f"**Time:** {task['time']}\n"
+            field_value = f"**Time:** {task['time']} ({task['timezone']})\n"
             field_value += f"**Status:** {status_icon} {'Enabled' if task['enabled'] else 'Disabled'}\n"
             field_value += f"**Running:** {running_icon} {'Yes' if task['running'] else 'No'}\n"
             
@@ -42,13 +39,19 @@ class SchedulerCommands(commands.Cog):
             else:
                 field_value += "**Channel:** Not set\n"
             
-            embed.add_field(
-                name=f"📅 {task['name']}",
-                value=field_value,
-                inline=True
-            )
+            fields.append((f"📅 {task['name']}", field_value))
         
-        await ctx.send(embed=embed)
+        # Respect the 25-fields-per-embed limit for long task lists
+        title = "📋 Scheduled Tasks"
+        for index, field_group in enumerate(pack_fields(title, fields)):
+            embed = discord.Embed(
+                title=title if index == 0 else continued_title(title),
+                color=discord.Color.blue()
+            )
+            for name, value in field_group:
+                embed.add_field(name=name, value=value, inline=True)
+            
+            await ctx.send(embed=embed)
     
     @commands.command(name='schedule_enable')
     @authorized_only()
@@ -57,17 +60,16 @@ class SchedulerCommands(commands.Cog):
         """Enable a specific scheduled task"""
         
         # Check if task exists
-        tasks = self.bot.scheduler.list_tasks()
-        if not any(task['name'] == task_name for task in tasks):
-            available_tasks = [task['name'] for task in tasks]
+        if not self.bot.scheduler.has_task(task_name):
+            available_tasks = self.bot.scheduler.task_names()
             await ctx.send(f"❌ Task '{task_name}' not found. Available tasks: {', '.join(available_tasks)}")
             return
         
-        self.bot.scheduler.start_task(task_name)
+        self.bot.scheduler.start_task(task_name, ctx.guild.id if ctx.guild else None)
         
         embed = discord.Embed(
             title="✅ Task Enabled",
-            description=f"Task '{task_name}' has been enabled",
+            description=f"Task '{task_name}' has been enabled for this server",
             color=discord.Color.green()
         )
         await ctx.send(embed=embed)
@@ -79,17 +81,16 @@ class SchedulerCommands(commands.Cog):
         """Disable a specific scheduled task"""
         
         # Check if task exists
-        tasks = self.bot.scheduler.list_tasks()
-        if not any(task['name'] == task_name for task in tasks):
-            available_tasks = [task['name'] for task in tasks]
+        if not self.bot.scheduler.has_task(task_name):
+            available_tasks = self.bot.scheduler.task_names()
             await ctx.send(f"❌ Task '{task_name}' not found. Available tasks: {', '.join(available_tasks)}")
             return
         
-        self.bot.scheduler.stop_task(task_name)
+        self.bot.scheduler.stop_task(task_name, ctx.guild.id if ctx.guild else None)
         
         embed = discord.Embed(
             title="⏸️ Task Disabled",
-            description=f"Task '{task_name}' has been disabled",
+            description=f"Task '{task_name}' has been disabled for this server",
             color=discord.Color.orange()
         )
         await ctx.send(embed=embed)
@@ -103,13 +104,13 @@ class SchedulerCommands(commands.Cog):
         target_channel = channel or ctx.channel
         
         # Check if task exists
-        tasks = self.bot.scheduler.list_tasks()
-        if not any(task['name'] == task_name for task in tasks):
-            available_tasks = [task['name'] for task in tasks]
+        if not self.bot.scheduler.has_task(task_name):
+            available_tasks = self.bot.scheduler.task_names()
             await ctx.send(f"❌ Task '{task_name}' not found. Available tasks: {', '.join(available_tasks)}")
             return
         
-        self.bot.scheduler.set_notification_channel(task_name, target_channel.id)
+        guild_id = target_channel.guild.id if getattr(target_channel, 'guild', None) else None
+        self.bot.scheduler.set_notification_channel(task_name, target_channel.id, guild_id)
         
         embed = discord.Embed(
             title="📍 Channel Set",
@@ -129,13 +130,12 @@ class SchedulerCommands(commands.Cog):
             return
         
         # Check if task exists
-        tasks = self.bot.scheduler.list_tasks()
-        if not any(task['name'] == task_name for task in tasks):
-            available_tasks = [task['name'] for task in tasks]
+        if not self.bot.scheduler.has_task(task_name):
+            available_tasks = self.bot.scheduler.task_names()
             await ctx.send(f"❌ Task '{task_name}' not found. Available tasks: {', '.join(available_tasks)}")
             return
         
-        success = self.bot.scheduler.update_task_time(task_name, hour, minute)
+        success = self.bot.scheduler.update_task_time(task_name, hour, minute, ctx.guild.id if ctx.guild else None)
         
         if success:
             embed = discord.Embed(
@@ -151,6 +151,30 @@ class SchedulerCommands(commands.Cog):
             )
         
         await ctx.send(embed=embed)
+    
+    @commands.command(name='schedule_timezone')
+    @authorized_only()
+    @require_bot_attribute('scheduler')
+    async def set_timezone(self, ctx, timezone: str):
+        """Set the timezone this server's scheduled tasks run in (e.g. Asia/Seoul)"""
+        
+        guild_id = ctx.guild.id if ctx.guild else None
+        success = self.bot.scheduler.set_guild_timezone(guild_id, timezone)
+        
+        if success:
+            embed = discord.Embed(
+                title="🌐 Timezone Updated",
+                description=f"Scheduled tasks will now run on {timezone} time",
+                color=discord.Color.green()
+            )
+        else:
+            embed = discord.Embed(
+                title="❌ Update Failed",
+                description=f"Unknown timezone '{timezone}'. Use a name like Asia/Seoul or America/New_York",
+                color=discord.Color.red()
+            )
+        
+        await ctx.send(embed=embed)
 
 async def setup(bot):
     await bot.add_cog(SchedulerCommands(bot))
\ No newline at end of file
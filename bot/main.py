@@ -1,61 +1,107 @@
+# Start timing before anything heavy is imported
+from utils.startup import StartupTimer
+startup_timer = StartupTimer()
+
 import discord
 from discord.ext import commands
+import logging
 import os
 import signal
 import sys
 import asyncio
+from time import perf_counter
 from dotenv import load_dotenv
+from services.calendar_service import GoogleCalendarService
 from services.scheduler_service import SchedulerService
+from services.schedule_store import ScheduleStore
 from services.schedule_config import ScheduleConfig
+from utils.admission import get_admission_controller
+from utils.authorization import get_authorizer
+from utils.decorators import NotAuthorized
+from utils.logging_setup import setup_logging
+from utils.metrics import registry, start_metrics_server
 
 load_dotenv()
+setup_logging()
+logger = logging.getLogger('bot')
+startup_timer.mark('imports')
 
 intents = discord.Intents.default()
 intents.message_content = True
 
-bot = commands.Bot(command_prefix=os.getenv('COMMAND_PREFIX', '!'), intents=intents, help_command=None)
+COMMAND_PREFIX = os.getenv('COMMAND_PREFIX', '!')
+bot = commands.Bot(command_prefix=COMMAND_PREFIX, intents=intents, help_command=None)
 
 # Initialize services
-bot.scheduler = SchedulerService(bot)
-schedule_config = ScheduleConfig()
+bot.scheduler = SchedulerService(bot, ScheduleStore())
+bot.calendar_service = GoogleCalendarService()
+schedule_config = ScheduleConfig(bot.calendar_service)
+bot.authorizer = get_authorizer()
+bot.admission = get_admission_controller()
+startup_timer.mark('services')
+
+COMMAND_LATENCY = registry.histogram('bot_command_seconds', 'Command handler latency')
+COMMANDS = registry.counter('bot_commands_total', 'Commands invoked, by outcome')
+COMMAND_ERRORS = registry.counter('bot_command_errors_total', 'Command errors, by type')
 
 @bot.event
 async def on_ready():
-    print(f'{bot.user} has connected to Discord!')
-    print(f'Bot is in {len(bot.guilds)} guilds')
+    logger.info(f'{bot.user} has connected to Discord!', extra={'guilds': len(bot.guilds)})
+    startup_timer.mark('connect')
     
     # Load command extensions
     await load_extensions()
+    startup_timer.mark('extensions')
     
     # Setup scheduler
     await setup_scheduler()
+    startup_timer.mark('scheduler')
     
-    print('🚀 Bot is ready!')
+    logger.info('🚀 Bot is ready!')
+    if not startup_timer.reported:
+        logger.info(startup_timer.report())
 
 @bot.event
 async def on_message(message):
-    if message.author == bot.user:
+    # Most messages are not commands: drop them before any logging or parsing
+    if not message.content.startswith(COMMAND_PREFIX) or message.author == bot.user:
         return
     
-    # Handle DM vs Guild channel names
-    if isinstance(message.channel, discord.DMChannel):
-        channel_name = "DM"
-    else:
-        channel_name = f"#{message.channel.name}"
-    
-    print(f'Message received from {message.author} in {channel_name}: {message.content}')
+    # Ids and the command name only, never message content
+    words = message.content[len(COMMAND_PREFIX):].split(maxsplit=1)
+    logger.debug('Command received', extra={
+        'command': words[0] if words else '',
+        'user_id': message.author.id,
+        'guild_id': message.guild.id if message.guild else None,
+        'channel_id': message.channel.id
+    })
     await bot.process_commands(message)
 
+@bot.before_invoke
+async def start_command_timer(ctx):
+    ctx.started = perf_counter()
+
+@bot.after_invoke
+async def record_command_metrics(ctx):
+    """Runs after every invoked command, successful or not"""
+    command = ctx.command.qualified_name
+    COMMAND_LATENCY.observe(perf_counter() - ctx.started, command=command)
+    COMMANDS.inc(command=command, status='error' if ctx.command_failed else 'ok')
+
 async def load_extensions():
-    """Load all command extensions"""
+    """Load all command extensions concurrently"""
     extensions = ['commands.basic', 'commands.calendar', 'commands.scheduler']
     
-    for extension in extensions:
-        try:
-            await bot.load_extension(extension)
-            print(f'✅ Loaded {extension}')
-        except Exception as e:
-            print(f'❌ Failed to load {extension}: {e}')
+    results = await asyncio.gather(
+        *(bot.load_extension(extension) for extension in extensions),
+        return_exceptions=True
+    )
+    
+    for extension, result in zip(extensions, results):
+        if isinstance(result, Exception):
+            logger.error(f'❌ Failed to load {extension}: {result}')
+        else:
+            logger.info(f'✅ Loaded {extension}')
 
 async def setup_scheduler():
     """Setup scheduled tasks from configuration"""
@@ -68,30 +114,52 @@ async def setup_scheduler():
         bot.scheduler.add_task(
             name=task_config['name'],
             func=task_config['func'],
-            hour=task_config['hour'],
-            minute=task_config['minute'],
-            enabled=task_config['enabled']
+            hour=task_config.get('hour'),
+            minute=task_config.get('minute', 0),
+            enabled=task_config['enabled'],
+            cron=task_config.get('cron'),
+            interval=task_config.get('interval'),
+            timezone=task_config.get('timezone'),
+            prepare=task_config.get('prepare')
         )
-        print(f"Added scheduled task: {task_config['name']} at {task_config['hour']:02d}:{task_config['minute']:02d} - {task_config['description']}")
+        logger.info(f"Added scheduled task: {task_config['name']} - {task_config['description']}")
+    
+    # Restore channels, times and timezones saved before the last restart
+    bot.scheduler.load_settings()
     
     # Start all scheduled tasks
     bot.scheduler.start_all()
-    print(f'✅ Scheduler initialized with {len(enabled_tasks)} tasks')
+    logger.info(f'✅ Scheduler initialized with {len(enabled_tasks)} tasks')
 
 @bot.event
 async def on_command_error(ctx, error):
     """Handle command errors"""
+    COMMAND_ERRORS.inc(error=type(error).__name__)
     if isinstance(error, commands.CommandNotFound):
         await ctx.send(f"❌ Unknown command. Use `!help` to see available commands.")
     elif isinstance(error, commands.MissingRequiredArgument):
         await ctx.send(f"❌ Missing required argument. Use `!help` for command usage.")
+    elif isinstance(error, NotAuthorized):
+        await ctx.send(str(error))
     elif isinstance(error, commands.CommandOnCooldown):
         await ctx.send(f"⏰ Command is on cooldown. Try again in {error.retry_after:.2f} seconds.")
     else:
-        print(f"Unhandled error: {error}")
+        logger.error(f"Unhandled error: {error}", extra={'command': ctx.command.qualified_name if ctx.command else None})
+
+async def run_bot(token):
+    """Run the bot and release shared services on shutdown"""
+    metrics_server = await start_metrics_server()
+    try:
+        async with bot:
+            await bot.start(token)
+    finally:
+        if metrics_server:
+            metrics_server.close()
+        await bot.calendar_service.close()
+        await bot.scheduler.store.close()
 
 def signal_handler(sig, frame):
-    print('\nReceived shutdown signal. Closing bot...')
+    logger.info('Received shutdown signal. Closing bot...')
     sys.exit(0)
 
 if __name__ == '__main__':
@@ -101,15 +169,14 @@ if __name__ == '__main__':
     
     token = os.getenv('DISCORD_TOKEN')
     if not token:
-        print("Error: DISCORD_TOKEN not found in environment variables")
-        print("Please set your Discord bot token in the .env file")
+        logger.error("DISCORD_TOKEN not found in environment variables. Please set your Discord bot token in the .env file")
         exit(1)
     
     try:
-        bot.run(token)
+        asyncio.run(run_bot(token))
     except KeyboardInterrupt:
-        print('\nBot stopped by user.')
+        logger.info('Bot stopped by user.')
     except Exception as e:
-        print(f'Bot encountered an error: {e}')
+        logger.exception(f'Bot encountered an error: {e}')
     finally:
-        print('Bot shutdown complete.')
+        logger.info('Bot shutdown complete.')
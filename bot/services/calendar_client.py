@@ -0,0 +1,144 @@
+"""
+Async Google Calendar API client
+Talks to the Calendar v3 REST API directly over a pooled aiohttp session
+"""
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from time import perf_counter
+from urllib.parse import quote
+import aiohttp
+from utils.metrics import registry
+from .quota import QuotaManager
+from .single_flight import SingleFlight
+
+CALENDAR_API_URL = 'https://www.googleapis.com/calendar/v3'
+
+# Partial response: only the fields the bot actually renders
+EVENT_LIST_FIELDS = 'items(id,status,summary,location,description,start,end),nextPageToken,nextSyncToken'
+
+API_LATENCY = registry.histogram('calendar_api_request_seconds', 'Calendar API events.list request latency')
+
+class CalendarApiError(Exception):
+    """Raised when the Calendar API answers with a non-success status"""
+    
+    def __init__(self, status: int, message: str, retry_after: float | None = None, reason: str | None = None):
+        super().__init__(f"Calendar API error {status}: {message}")
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+        self.reason = reason  # error.errors[0].reason, e.g. 'rateLimitExceeded'
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header, given as seconds or as an HTTP date"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+class CalendarApiClient:
+    """Non-blocking Calendar v3 client sharing one keep-alive connection pool"""
+    
+    def __init__(self, api_key: str, max_connections: int = 10, timeout: float = 10.0,
+                 base_url: str = CALENDAR_API_URL, quota: QuotaManager | None = None):
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.base_url = base_url.rstrip('/')
+        self._session: aiohttp.ClientSession | None = None
+        self.quota = quota or QuotaManager()
+        # Identical page requests in flight at once share one HTTP request
+        self._requests = SingleFlight('events_list')
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the pooled session lazily, inside the running event loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections,
+                keepalive_timeout=60,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                # Google only compresses responses for user agents mentioning gzip
+                headers={
+                    'Accept-Encoding': 'gzip',
+                    'User-Agent': 'equal-accessibility-bot (gzip)'
+                }
+            )
+        return self._session
+    
+    async def list_events(self, calendar_id: str, fields: str = EVENT_LIST_FIELDS, **params) -> dict:
+        """Fetch a single page of events.list, sharing an identical request already in flight"""
+        query = {'key': self.api_key, 'fields': fields}
+        for key, value in params.items():
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                value = 'true' if value else 'false'
+            query[key] = str(value)
+        
+        request_key = (calendar_id, tuple(sorted(query.items())))
+        page, _ = await self._requests.do(
+            request_key,
+            lambda: self.quota.call(lambda: self._get_page(calendar_id, query))
+        )
+        return page
+    
+    async def _get_page(self, calendar_id: str, query: dict) -> dict:
+        """Issue one events.list request"""
+        url = f"{self.base_url}/calendars/{quote(calendar_id, safe='')}/events"
+        session = self._get_session()
+        
+        started = perf_counter()
+        status = 'error'
+        try:
+            async with session.get(url, params=query) as response:
+                status = response.status
+                if response.status != 200:
+                    raise await self._error_from_response(response)
+                return await response.json()
+        finally:
+            API_LATENCY.observe(perf_counter() - started, status=status)
+    
+    async def iter_event_pages(self, calendar_id: str, fields: str = EVENT_LIST_FIELDS, **params):
+        """Yield events.list pages as they arrive, following nextPageToken"""
+        page_token = None
+        
+        while True:
+            page = await self.list_events(calendar_id, fields=fields, pageToken=page_token, **params)
+            yield page
+            page_token = page.get('nextPageToken')
+            if not page_token:
+                return
+    
+    async def _error_from_response(self, response: aiohttp.ClientResponse) -> CalendarApiError:
+        """Build a CalendarApiError from an error response body"""
+        message = response.reason or 'Unknown error'
+        reason = None
+        try:
+            error = (await response.json(content_type=None)).get('error', {})
+            message = error.get('message', message)
+            errors = error.get('errors') or [{}]
+            reason = errors[0].get('reason')
+        except Exception:
+            pass
+        
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        return CalendarApiError(response.status, message, retry_after, reason)
+    
+    async def close(self):
+        """Close the pooled session"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -0,0 +1,68 @@
+"""
+Calendar event model
+Compact events parsed once from the API and shared by the store, index and renderer
+"""
+
+from datetime import datetime, time
+from .schedule_renderer import DESCRIPTION_PREVIEW_LENGTH
+
+def parse_event_time(value: dict, timezone) -> datetime:
+    """Parse an event start/end object into an aware datetime"""
+    if 'dateTime' in value:
+        return datetime.fromisoformat(value['dateTime'].replace('Z', '+00:00'))
+    
+    # All-day events carry a bare date, which starts at local midnight
+    day = datetime.fromisoformat(value['date']).date()
+    return timezone.localize(datetime.combine(day, time()))
+
+class CalendarEvent:
+    """
+    One event with its times parsed and its display fields precomputed
+    
+    Only what the bot renders is kept: descriptions are cut to the preview
+    length (plus one character, so the renderer can tell they were cut).
+    """
+    
+    __slots__ = ('id', 'calendar', 'title', 'location', 'description', 'start', 'end', 'start_day', 'all_day', 'time')
+    
+    def __init__(self, event_id: str, calendar: str, title: str, location: str, description: str,
+                 start: datetime, end: datetime, timezone, all_day: bool = False):
+        self.id = event_id
+        self.calendar = calendar
+        self.title = title
+        self.location = location
+        self.description = description
+        self.start = start
+        self.end = end
+        self.all_day = all_day
+        
+        start_local = start.astimezone(timezone)
+        self.start_day = start_local.date()
+        if all_day:
+            self.time = "All day"
+        else:
+            self.time = f"{start_local.strftime('%H:%M')} - {end.astimezone(timezone).strftime('%H:%M')}"
+    
+    def time_in(self, timezone) -> str:
+        """The time label on another timezone's clock (all-day events keep their date)"""
+        if self.all_day:
+            return self.time
+        return f"{self.start.astimezone(timezone).strftime('%H:%M')} - {self.end.astimezone(timezone).strftime('%H:%M')}"
+    
+    @classmethod
+    def from_api(cls, event: dict, timezone, calendar: str = '') -> 'CalendarEvent':
+        """Parse a Calendar API event resource"""
+        return cls(
+            event['id'],
+            calendar,
+            event.get('summary', 'No title'),
+            event.get('location', ''),
+            event.get('description', '')[:DESCRIPTION_PREVIEW_LENGTH + 1],
+            parse_event_time(event['start'], timezone),
+            parse_event_time(event['end'], timezone),
+            timezone,
+            all_day='dateTime' not in event['start']
+        )
+    
+    def __repr__(self):
+        return f"CalendarEvent({self.id!r}, {self.title!r}, {self.start.isoformat()})"
@@ -1,116 +1,336 @@
+import asyncio
+import heapq
+import logging
 import os
-from datetime import datetime, timedelta
-from googleapiclient.discovery import build
+from datetime import datetime, time, timedelta
+from itertools import count
+from time import perf_counter
 import pytz
+from utils.metrics import registry
+from .calendar_source import CalendarSource, parse_calendar_ids
+
+logger = logging.getLogger(__name__)
+
+SYNC_RESULTS = registry.counter(
+    'calendar_sync_total',
+    'Calendar syncs by how they were served (fresh = cache hit, shared = joined a sync in flight)'
+)
+SYNC_LATENCY = registry.histogram('calendar_sync_seconds', 'Time to sync one calendar, cache hits included')
+QUERY_LATENCY = registry.histogram('calendar_query_seconds', 'Time to answer a schedule query')
+
+class CalendarUnavailableError(Exception):
+    """Raised when no calendar could be fetched and there are no stored events to fall back on"""
+    
+    def __init__(self, cause: Exception):
+        super().__init__(f"Google Calendar is unavailable: {str(cause) or type(cause).__name__}")
+        self.cause = cause
 
 class GoogleCalendarService:
     def __init__(self):
-        self.service = None
-        self.calendar_id = os.getenv('GOOGLE_CALENDAR_ID')
+        self.client = None
         self.api_key = os.getenv('GOOGLE_API_KEY')
+        self.max_connections = int(os.getenv('CALENDAR_MAX_CONNECTIONS', '10'))
         self.timezone = pytz.timezone(os.getenv('TIMEZONE', 'Asia/Seoul'))
+        
+        # One source per calendar, each with its own event store and day index
+        calendar_ids = os.getenv('GOOGLE_CALENDAR_IDS') or os.getenv('GOOGLE_CALENDAR_ID', '')
+        self.sources = [
+            CalendarSource(
+                calendar_id,
+                label,
+                self.timezone,
+                sync_interval=int(os.getenv('CALENDAR_SYNC_INTERVAL', '60')),
+                sync_window_days=int(os.getenv('CALENDAR_SYNC_WINDOW_DAYS', '60')),
+                index_days=int(os.getenv('CALENDAR_INDEX_DAYS', '31'))
+            )
+            for label, calendar_id in parse_calendar_ids(calendar_ids)
+        ]
+        # Labels are only worth showing when events come from several calendars
+        self.show_labels = len(self.sources) > 1
+        
+        # Bound concurrent calendar fetches and isolate slow calendars
+        self.fetch_timeout = float(os.getenv('CALENDAR_FETCH_TIMEOUT', '15'))
+        # How long a query waits for calendars it could already answer from memory
+        self.refresh_deadline = float(os.getenv('CALENDAR_REFRESH_DEADLINE', '0.5'))
+        self._fetch_limit = asyncio.Semaphore(int(os.getenv('CALENDAR_CONCURRENCY', '4')))
+        self._sync_task = None
+        self._refresh_tasks = set()
+        # Set while answers come from stored events because a calendar could not be refreshed
+        self.degraded = False
+        self._failing = set()
+    
+    @property
+    def version(self) -> tuple[int, ...]:
+        """Changes whenever any calendar's events change"""
+        return tuple(source.store.version for source in self.sources)
     
     async def authenticate(self):
         """Initialize Google Calendar API service for public calendar access"""
         if not self.api_key:
             raise ValueError("GOOGLE_API_KEY not found in environment variables")
         
-        if not self.calendar_id:
+        if not self.sources:
             raise ValueError("GOOGLE_CALENDAR_ID not found in environment variables")
         
-        # Build service with API key (no OAuth needed for public calendars)
-        self.service = build('calendar', 'v3', developerKey=self.api_key)
+        # Imported on first use to keep aiohttp setup off the startup path
+        from .calendar_client import CalendarApiClient
+        
+        # API key is enough for public calendars (no OAuth needed)
+        self.client = CalendarApiClient(self.api_key, max_connections=self.max_connections)
         return True
     
-    async def get_today_events(self):
-        """Get today's events from calendar"""
-        if not self.service:
+    async def close(self):
+        """Release the pooled HTTP connections"""
+        if self._sync_task and not self._sync_task.done():
+            self._sync_task.cancel()
+        for task in self._refresh_tasks:
+            task.cancel()
+        if self.client:
+            await self.client.close()
+    
+    async def sync(self, until=None, force=False, sources=None):
+        """Sync every calendar (or the given ones) concurrently; fails only if no calendar can be served"""
+        if not self.client:
             await self.authenticate()
         
-        # Get today's date range
-        now = datetime.now(self.timezone)
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = today_start + timedelta(days=1)
+        sources = self.sources if sources is None else sources
+        results = await asyncio.gather(*(self._sync_source(source, until, force) for source in sources))
+        for source, error in zip(sources, results):
+            if error is None:
+                self._failing.discard(source.calendar_id)
+            else:
+                self._failing.add(source.calendar_id)
         
-        # Convert to UTC for API call
-        time_min = today_start.astimezone(pytz.UTC).isoformat()
-        time_max = today_end.astimezone(pytz.UTC).isoformat()
+        errors = [error for error in results if error is not None]
+        if errors and not any(source.store.ready for source in self.sources):
+            raise CalendarUnavailableError(errors[0]) from errors[0]
+        # Otherwise the last good copy of a failed calendar is served
+        self.degraded = bool(self._failing)
+    
+    async def refresh(self, until):
+        """
+        Bring the events up to `until` up to date without letting one slow calendar hold up a query
         
+        Calendars missing part of the range are synced first. Calendars that
+        already hold it get at most refresh_deadline to sync; past that their
+        stored events are served and the sync finishes in the background.
+        """
+        cold = [source for source in self.sources if not (source.store.ready and source.store.covers(until))]
+        warm = [source for source in self.sources if source not in cold]
+        if cold:
+            await self.sync(until=until, sources=cold)
+        if warm:
+            task = asyncio.ensure_future(self.sync(until=until, sources=warm))
+            self._refresh_tasks.add(task)
+            task.add_done_callback(self._forget_refresh)
+            await asyncio.wait({task}, timeout=self.refresh_deadline)
+            if task.done():
+                task.result()
+    
+    def _forget_refresh(self, task):
+        """Drop a finished background refresh, marking its error retrieved"""
+        self._refresh_tasks.discard(task)
+        if not task.cancelled():
+            task.exception()
+    
+    async def _sync_source(self, source, until, force):
+        """Sync one calendar, returning its error instead of raising"""
+        started = perf_counter()
+        result = 'error'
         try:
-            events_result = self.service.events().list(
-                calendarId=self.calendar_id,
-                timeMin=time_min,
-                timeMax=time_max,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
-            return self._format_events(events)
-            
+            result = await asyncio.wait_for(
+                source.sync(self.client, until, force, limit=self._fetch_limit), self.fetch_timeout
+            )
+        except asyncio.TimeoutError as e:
+            result = 'timeout'
+            logger.warning(f"Calendar '{source.label}' sync timed out after {self.fetch_timeout:g}s",
+                           extra={'calendar': source.label})
+            return e
         except Exception as e:
-            print(f"Error fetching calendar events: {e}")
-            return []
+            logger.warning(f"Calendar '{source.label}' sync failed: {e}", extra={'calendar': source.label})
+            return e
+        finally:
+            SYNC_RESULTS.inc(calendar=source.label, result=result)
+            SYNC_LATENCY.observe(perf_counter() - started, result=result)
+        return None
+    
+    async def _events_by_day(self, start, end, refresh=True, timezone=None):
+        """Answer a time range query from memory, merged across calendars, with dates on the timezone's clock"""
+        if refresh:
+            await self.refresh(end)
+        
+        # Each calendar is already ordered by (date, start): k-way merge, no re-sort
+        local = timezone is not None and timezone.zone != self.timezone.zone
+        per_calendar = [
+            [
+                (day, event_start, source.label, event)
+                for day, event_start, event in (
+                    source.events_by_local_day(start, end, timezone) if local else source.events_by_day(start, end)
+                )
+            ]
+            for source in self.sources
+            if source.store.ready
+        ]
+        return heapq.merge(*per_calendar, key=lambda entry: entry[:2])
+    
+    def _group_by_day(self, entries):
+        """Group ordered (date, start, label, event) entries into (date, events)"""
+        groups = []
+        for day, _, _, event in entries:
+            if groups and groups[-1][0] == day:
+                groups[-1][1].append(event)
+            else:
+                groups.append((day, [event]))
+        return groups
+    
+    def day_range(self, days, timezone=None):
+        """Time range for today (days=0) or the next N days from now, in the timezone (TIMEZONE by default)"""
+        timezone = timezone or self.timezone
+        # Whole minutes, so concurrent views of the same range share upstream requests
+        now = datetime.now(timezone).replace(second=0, microsecond=0)
+        if days == 0:
+            # Local midnights, which differ in UTC offset on DST change days
+            today = now.date()
+            return (timezone.localize(datetime.combine(today, time())),
+                    timezone.localize(datetime.combine(today + timedelta(days=1), time())))
+        return now, now + timedelta(days=days)
+    
+    def is_warm(self, end) -> bool:
+        """Whether every calendar's events up to end are already in memory"""
+        return all(source.store.ready and source.store.covers(end) for source in self.sources)
+    
+    async def get_events_by_day(self, days=0, refresh=True, timezone=None):
+        """Get events for today (days=0) or the next N days, grouped by local date in the timezone"""
+        if not self.client:
+            await self.authenticate()
+        
+        start, end = self.day_range(days, timezone)
+        
+        # Raises CalendarUnavailableError rather than passing an outage off as an empty day
+        with QUERY_LATENCY.time(view='today' if days == 0 else 'range'):
+            return self._group_by_day(await self._events_by_day(start, end, refresh, timezone))
+    
+    async def get_today_events(self):
+        """Get today's events from calendar"""
+        groups = await self.get_events_by_day(0)
+        return [event for _, events in groups for event in events]
     
     async def get_upcoming_events(self, days=7):
         """Get upcoming events for next N days"""
-        if not self.service:
+        groups = await self.get_events_by_day(days)
+        return [event for _, events in groups for event in events]
+    
+    async def iter_upcoming_events(self, days=7):
+        """Yield batches of (date, events) groups for the next N days as soon as each is available"""
+        if not self.client:
             await self.authenticate()
         
-        now = datetime.now(self.timezone)
-        time_min = now.isoformat()
-        time_max = (now + timedelta(days=days)).isoformat()
+        start, end = self.day_range(days)
         
-        try:
-            events_result = self.service.events().list(
-                calendarId=self.calendar_id,
-                timeMin=time_min,
-                timeMax=time_max,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
-            return self._format_events(events)
-            
-        except Exception as e:
-            print(f"Error fetching upcoming events: {e}")
-            return []
+        # Warm stores: a single batch straight from the day indexes
+        cold_sources = [source for source in self.sources if not (source.store.ready and source.store.covers(end))]
+        if not cold_sources:
+            yield await self.get_events_by_day(days)
+            return
+        
+        # Cold stores: stream ordered pages while the stores fill in the background
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self._background_sync(end))
+        
+        streams = []
+        for source in self.sources:
+            if source in cold_sources:
+                streams.append(self._labelled_stream(source, source.stream_by_day(self.client, start, end)))
+            else:
+                streams.append(self._labelled_stream(source, self._single_batch(source.events_by_day(start, end))))
+        
+        errors = []
+        streamed = False
+        async for entries in self._merge_streams(streams, errors):
+            streamed = True
+            yield self._group_by_day(entries)
+        
+        if errors and len(errors) == len(streams) and not streamed:
+            raise CalendarUnavailableError(errors[0])
+        self.degraded = bool(errors)
+    
+    async def _single_batch(self, entries):
+        """Wrap entries already in memory as a one-batch stream"""
+        yield entries
     
-    def _format_events(self, events):
-        """Format events for display"""
-        formatted_events = []
+    async def _labelled_stream(self, source, stream):
+        """Tag each (date, start, event) entry of a stream with its calendar label"""
+        async for entries in stream:
+            yield [(day, event_start, source.label, event) for day, event_start, event in entries]
+    
+    async def _merge_streams(self, streams, errors=None):
+        """
+        K-way merge of ordered entry streams, yielding each ordered run as soon as it is safe
         
-        for event in events:
-            title = event.get('summary', 'No title')
-            
-            # Handle all-day events
-            start = event['start'].get('dateTime', event['start'].get('date'))
-            end = event['end'].get('dateTime', event['end'].get('date'))
+        An entry is safe once every unfinished stream has buffered an entry
+        at or after it. A stream that fails or exceeds the fetch timeout is
+        dropped so it cannot hold back the others; its error is appended to
+        errors.
+        """
+        heap = []
+        sequence = count()
+        watermarks = {index: None for index in range(len(streams))}  # active stream -> last buffered key
+        
+        async def pull(index):
+            try:
+                async with self._fetch_limit:
+                    return index, await asyncio.wait_for(anext(streams[index]), self.fetch_timeout)
+            except StopAsyncIteration:
+                return index, None
+            except asyncio.TimeoutError as e:
+                logger.warning(f"Calendar stream timed out after {self.fetch_timeout:g}s, skipping it", extra={'stream': index})
+                if errors is not None:
+                    errors.append(e)
+                return index, None
+            except Exception as e:
+                logger.warning(f"Error streaming calendar events: {e}", extra={'stream': index})
+                if errors is not None:
+                    errors.append(e)
+                return index, None
+        
+        waiting = list(watermarks)
+        while waiting:
+            for index, entries in await asyncio.gather(*(pull(index) for index in waiting)):
+                if entries is None:
+                    del watermarks[index]
+                    continue
+                for entry in entries:
+                    heapq.heappush(heap, (entry[:2], next(sequence), entry))
+                if entries:
+                    watermarks[index] = entries[-1][:2]
             
-            # Parse datetime
-            if 'T' in start:  # Has time
-                start_dt = datetime.fromisoformat(start.replace('Z', '+00:00'))
-                end_dt = datetime.fromisoformat(end.replace('Z', '+00:00'))
-                
-                # Convert to local timezone
-                start_local = start_dt.astimezone(self.timezone)
-                end_local = end_dt.astimezone(self.timezone)
-                
-                time_str = f"{start_local.strftime('%H:%M')} - {end_local.strftime('%H:%M')}"
-            else:  # All-day event
-                time_str = "All day"
+            # Emit everything no unfinished stream can still precede
+            pending = [key for key in watermarks.values() if key is not None]
+            if len(pending) < len(watermarks):
+                safe_key = None
+            else:
+                safe_key = min(pending, default=None)
             
-            location = event.get('location', '')
-            description = event.get('description', '')
+            ready = []
+            while heap and (not watermarks or (safe_key is not None and heap[0][0] <= safe_key)):
+                ready.append(heapq.heappop(heap)[2])
+            if ready:
+                yield ready
             
-            formatted_events.append({
-                'title': title,
-                'time': time_str,
-                'location': location,
-                'description': description,
-                'start': start,
-                'end': end
-            })
-        
-        return formatted_events
\ No newline at end of file
+            # Pull next from the streams holding back the merge
+            if not watermarks:
+                break
+            if safe_key is None:
+                waiting = [index for index, key in watermarks.items() if key is None]
+            else:
+                waiting = [index for index, key in watermarks.items() if key == safe_key]
+        
+        if heap:
+            yield [heapq.heappop(heap)[2] for _ in range(len(heap))]
+    
+    async def _background_sync(self, until):
+        """Populate the event stores without blocking the caller"""
+        try:
+            await self.sync(until=until)
+        except Exception as e:
+            logger.warning(f"Background calendar sync failed: {e}")
\ No newline at end of file
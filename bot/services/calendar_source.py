@@ -0,0 +1,206 @@
+"""
+Calendar source module
+Per-calendar sync state: one event store and day index for each calendar ID
+"""
+
+import logging
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
+import pytz
+from .calendar_event import CalendarEvent
+from .event_index import DayIndex
+from .event_store import EventStore
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# events.list page sizes: large pages for background sync, small pages so
+# streamed views can render the first events before the rest arrive
+SYNC_PAGE_SIZE = 2500
+STREAM_PAGE_SIZE = 250
+
+def parse_calendar_ids(value: str) -> list[tuple[str, str]]:
+    """
+    Parse a comma-separated calendar list into (label, calendar_id) pairs
+    
+    Entries may be labelled as "Label=calendar_id"; unlabelled entries use
+    the part of the ID before '@'.
+    """
+    calendars = []
+    for entry in value.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if '=' in entry:
+            label, calendar_id = (part.strip() for part in entry.split('=', 1))
+        else:
+            label, calendar_id = entry.split('@', 1)[0], entry
+        calendars.append((label, calendar_id))
+    return calendars
+
+class CalendarSource:
+    """One calendar kept in memory with incremental sync"""
+    
+    def __init__(self, calendar_id: str, label: str, timezone, sync_interval: int = 60,
+                 sync_window_days: int = 60, index_days: int = 31):
+        self.calendar_id = calendar_id
+        self.label = label
+        self.timezone = timezone
+        self.sync_interval = sync_interval
+        self.sync_window_days = sync_window_days
+        
+        self.store = EventStore(timezone, label)
+        self.index = DayIndex(timezone, index_days)
+        self._syncs = SingleFlight('calendar_sync')
+    
+    async def sync(self, client, until=None, force=False, limit=None) -> str:
+        """
+        Bring the event store up to date, using incremental sync when possible
+        
+        Concurrent callers share the sync already in flight. The optional
+        limit (a semaphore shared across calendars) is only held by the sync
+        that actually runs, so callers never queue for it just to join one.
+        Returns how it was served: 'fresh' (no request), 'incremental',
+        'full' or 'shared'.
+        """
+        while True:
+            result, shared = await self._syncs.do(self.calendar_id, lambda: self._limited_sync(client, until, force, limit))
+            if not shared:
+                return result
+            
+            # The shared sync may not have reached this caller's window or
+            # fetched anything; if so, run (or join) the next one
+            if (until is None or self.store.covers(until)) and not (force and result == 'fresh'):
+                return 'shared'
+    
+    async def _limited_sync(self, client, until, force, limit) -> str:
+        """Run one sync while holding the fetch limit"""
+        async with limit or nullcontext():
+            return await self._sync(client, until, force)
+    
+    async def _sync(self, client, until, force) -> str:
+        """Run one sync; only ever one at a time per calendar"""
+        needs_window = until is not None and not self.store.covers(until)
+        if not force and not needs_window and self.store.is_fresh(self.sync_interval):
+            return 'fresh'
+        
+        if self.store.ready and not needs_window and not self.store.token_expired:
+            try:
+                await self._incremental_sync(client)
+                return 'incremental'
+            except Exception as e:
+                # 410 Gone: the sync token expired, start over with a full sync. The
+                # stored events keep answering queries until it replaces them
+                if getattr(e, 'status', None) != 410:
+                    raise
+                logger.info(f"Calendar '{self.label}' sync token expired, running full sync", extra={'calendar': self.label})
+                self.store.expire_sync_token()
+        
+        await self._full_sync(client)
+        return 'full'
+    
+    async def _full_sync(self, client):
+        """Download the whole sync window and store its sync token"""
+        today_start = datetime.now(self.timezone).replace(hour=0, minute=0, second=0, microsecond=0)
+        horizon = today_start + timedelta(days=self.sync_window_days)
+        
+        events, sync_token = await self._fetch_all_pages(
+            client,
+            timeMin=self._window_start().astimezone(pytz.UTC).isoformat(),
+            timeMax=horizon.astimezone(pytz.UTC).isoformat()
+        )
+        self.store.replace_all(events, sync_token, horizon)
+        logger.info(f"Calendar '{self.label}' full sync: {len(events)} events",
+                    extra={'calendar': self.label, 'events': len(events)})
+    
+    async def _incremental_sync(self, client):
+        """Fetch only the changes since the last sync"""
+        events, sync_token = await self._fetch_all_pages(client, syncToken=self.store.sync_token)
+        changed = self.store.apply_changes(events, sync_token)
+        
+        self.store.prune_before(self._window_start())
+        if changed:
+            logger.info(f"Calendar '{self.label}' incremental sync: {changed} changed events",
+                        extra={'calendar': self.label, 'events': changed})
+    
+    def _window_start(self) -> datetime:
+        """Start of the stored events: yesterday, so guilds on timezones behind this one still see their today"""
+        yesterday = datetime.now(self.timezone).date() - timedelta(days=1)
+        return self.timezone.localize(datetime.combine(yesterday, datetime.min.time()))
+    
+    async def _fetch_all_pages(self, client, **params):
+        """Collect every page of a sync request; the final page carries nextSyncToken"""
+        events = []
+        sync_token = None
+        
+        async for page in client.iter_event_pages(
+            self.calendar_id,
+            singleEvents=True,
+            maxResults=SYNC_PAGE_SIZE,
+            **params
+        ):
+            events.extend(page.get('items', []))
+            sync_token = page.get('nextSyncToken')
+        
+        return events, sync_token
+    
+    def events_by_day(self, start: datetime, end: datetime) -> list[tuple]:
+        """Return (date, start, event) entries overlapping [start, end) from memory"""
+        today = datetime.now(self.timezone).date()
+        if not self.index.is_current(self.store.version, today):
+            self.index.rebuild(self.store.events.values(), self.store.version, today)
+        
+        start_day = start.astimezone(self.timezone).date()
+        end_day = (end - timedelta(microseconds=1)).astimezone(self.timezone).date()
+        if self.index.covers(start_day, (end_day - start_day).days + 1):
+            return self.index.slice(start, end)
+        
+        # Outside the indexed window: key a store scan by start date, as the index would
+        return [(max(event.start_day, start_day), event.start, event) for event in self.store.events_between(start, end)]
+    
+    def events_by_local_day(self, start: datetime, end: datetime, timezone) -> list[tuple]:
+        """
+        Like events_by_day, keyed by start date on another timezone's clock
+        
+        Multi-day events go under the first day of the range they cover.
+        All-day events stay on their calendar dates, and are kept only when
+        those dates overlap the range's local days.
+        """
+        first_day = start.astimezone(timezone).date()
+        last_day = (end - timedelta(microseconds=1)).astimezone(timezone).date()
+        
+        entries = []
+        for event in self.store.events_between(start, end):
+            if not event.all_day:
+                entries.append((max(event.start.astimezone(timezone).date(), first_day), event.start, event))
+            elif event.start_day <= last_day and event.end.astimezone(self.timezone).date() > first_day:
+                entries.append((max(event.start_day, first_day), event.start, event))
+        entries.sort(key=lambda entry: entry[:2])
+        return entries
+    
+    async def stream_by_day(self, client, start: datetime, end: datetime):
+        """Yield ordered (date, start, event) entries page by page straight from the API"""
+        first_day = start.astimezone(self.timezone).date()
+        async for page in client.iter_event_pages(
+            self.calendar_id,
+            timeMin=start.isoformat(),
+            timeMax=end.isoformat(),
+            singleEvents=True,
+            orderBy='startTime',
+            maxResults=STREAM_PAGE_SIZE
+        ):
+            yield self.by_start_day(page.get('items', []), first_day)
+    
+    def by_start_day(self, events: list[dict], first_day: date | None = None) -> list[tuple]:
+        """
+        Parse raw events and key them by their local start date
+        
+        Events already in progress on first_day go under first_day, as the
+        day index files them.
+        """
+        entries = []
+        for event in events:
+            parsed = CalendarEvent.from_api(event, self.timezone, self.label)
+            day = parsed.start_day if first_day is None else max(parsed.start_day, first_day)
+            entries.append((day, parsed.start, parsed))
+        return entries
@@ -1,74 +1,107 @@
+import asyncio
+import logging
+import os
 import discord
 from .calendar_service import GoogleCalendarService
+from .fanout import SEND_LATENCY, FanoutDispatcher
+from .render_cache import RenderCache
+from .schedule_renderer import ScheduleRenderer
+
+logger = logging.getLogger(__name__)
+
+# Footer for schedules answered from stored events while a calendar cannot be refreshed
+DEGRADED_NOTICE = "⚠️ Google Calendar could not be reached; showing the last synced events"
 
 class CalendarTasks:
     """Calendar-specific scheduled tasks"""
     
-    def __init__(self):
-        self.calendar_service = GoogleCalendarService()
+    def __init__(self, calendar_service: GoogleCalendarService = None):
+        # Prefer the process-wide service so all callers share its connections and store
+        self.calendar_service = calendar_service or GoogleCalendarService()
+        self.dispatcher = FanoutDispatcher()
+        
+        # Rendered views, reused until the calendar version changes
+        self.render_cache = RenderCache()
+        self.refresh_timeout = float(os.getenv('DIGEST_REFRESH_TIMEOUT', '3'))
     
-    async def daily_schedule_notification(self, channel):
-        """Send daily schedule to the specified channel"""
-        if not channel:
-            print("No channel specified for daily schedule notification")
+    async def prepare_daily_schedule(self, channels=None):
+        """Fetch and render today's digest for each timezone ahead of time so the notification only has to send"""
+        try:
+            await self.calendar_service.sync()
+            timezones = list(channels or (None,))
+            for timezone in timezones:
+                await self._daily_embeds(timezone)
+            logger.info("Prepared today's schedule digest", extra={'timezones': len(timezones)})
+        except Exception as e:
+            logger.warning(f"Error preparing daily schedule: {e}")
+    
+    async def daily_schedule_notification(self, channels):
+        """Render the daily schedule once per timezone and deliver it to every subscribed channel"""
+        channels = {
+            timezone: [channel for channel in zone_channels if channel]
+            for timezone, zone_channels in channels.items()
+        }
+        channels = {timezone: zone_channels for timezone, zone_channels in channels.items() if zone_channels}
+        if not channels:
+            logger.warning("No channel specified for daily schedule notification")
             return
         
+        # One sync for every timezone. Cheap incremental check; if it is slow,
+        # the digest rendered from the stored events is good enough
         try:
-            # Get today's events
-            events = await self.calendar_service.get_today_events()
-            
-            if not events:
-                embed = discord.Embed(
-                    title="📅 Today's Schedule",
-                    description="No events scheduled for today! 🎉",
-                    color=discord.Color.green()
-                )
-                await channel.send(embed=embed)
-                return
-            
-            # Create embed for schedule
-            embed = discord.Embed(
-                title="📅 Today's Schedule",
-                color=discord.Color.blue()
-            )
-            
-            schedule_text = ""
-            for event in events:
-                schedule_text += f"🕐 **{event['time']}** - {event['title']}\n"
-                if event['location']:
-                    schedule_text += f"📍 {event['location']}\n"
-                if event['description']:
-                    # Limit description length
-                    desc = event['description'][:100] + "..." if len(event['description']) > 100 else event['description']
-                    schedule_text += f"📝 {desc}\n"
-                schedule_text += "\n"
-            
-            # Split into multiple embeds if too long
-            if len(schedule_text) > 4000:
-                chunks = self._split_text(schedule_text, 4000)
-                for i, chunk in enumerate(chunks):
-                    if i == 0:
-                        embed.description = chunk
-                        await channel.send(embed=embed)
-                    else:
-                        continuation_embed = discord.Embed(
-                            title="📅 Today's Schedule (continued)",
-                            description=chunk,
-                            color=discord.Color.blue()
-                        )
-                        await channel.send(embed=continuation_embed)
-            else:
-                embed.description = schedule_text
-                await channel.send(embed=embed)
-                
+            await asyncio.wait_for(self.calendar_service.sync(), self.refresh_timeout)
         except Exception as e:
-            error_embed = discord.Embed(
+            logger.warning(f"Sending schedule without refresh: {e!r}")
+        
+        await asyncio.gather(*(
+            self._deliver_daily(timezone, zone_channels) for timezone, zone_channels in channels.items()
+        ))
+    
+    async def _deliver_daily(self, timezone, channels):
+        """Send today's digest, with dates and times on the timezone's clock, to its channels"""
+        try:
+            embed_lists = await self._daily_embeds(timezone)
+        except Exception as e:
+            embed_lists = [[discord.Embed(
                 title="❌ Calendar Error",
                 description=f"Failed to fetch today's schedule: {str(e)}",
                 color=discord.Color.red()
-            )
-            await channel.send(embed=error_embed)
-            print(f"Error in daily schedule notification: {e}")
+            )]]
+            logger.error(f"Error in daily schedule notification: {e}",
+                         extra={'channels': len(channels), 'timezone': timezone.zone})
+        
+        await self.dispatcher.deliver(channels, [{'embeds': embeds} for embeds in embed_lists])
+    
+    async def _daily_embeds(self, timezone=None):
+        """Today's digest in the timezone from the render cache (prepared ahead of time), rendered on a miss"""
+        embed_lists = self.render_cache.get(self.calendar_service.version, self._view_key('daily', 0, timezone))
+        if embed_lists is None:
+            groups = await self.calendar_service.get_events_by_day(0, timezone=timezone)
+            embed_lists = self._render_daily(groups, timezone)
+            # Keyed after the fetch, which may have synced newer events
+            self.render_cache.put(self.calendar_service.version, self._view_key('daily', 0, timezone), embed_lists)
+        return embed_lists
+    
+    def _view_key(self, view, days, timezone=None):
+        """Render cache key: view type, date range, timezone and whether the events may be stale"""
+        timezone = timezone or self.calendar_service.timezone
+        start, end = self.calendar_service.day_range(days, timezone)
+        return (view, start, end, timezone.zone, self.calendar_service.degraded)
+    
+    def _render_daily(self, groups, timezone=None):
+        """Render today's (date, events) groups into the embed lists of each message"""
+        renderer = ScheduleRenderer("📅 Today's Schedule", show_labels=self.calendar_service.show_labels,
+                                    footer_length=len(DEGRADED_NOTICE), timezone=timezone)
+        renderer.add_groups(groups)
+        embed_lists = [self._schedule_embeds(message) for message in renderer.finish()]
+        if not renderer.event_count:
+            embed_lists = [[discord.Embed(
+                title=renderer.title,
+                description="No events scheduled for today! 🎉",
+                color=discord.Color.green()
+            )]]
+        self._mark_degraded(embed_lists[-1])
+        return embed_lists
     
     async def send_manual_schedule(self, channel, days=0):
         """Manually send schedule for today or upcoming days"""
@@ -76,98 +109,82 @@ class CalendarTasks:
             return
         
         try:
-            if days == 0:
-                events = await self.calendar_service.get_today_events()
-                title = "📅 Today's Schedule"
-            else:
-                events = await self.calendar_service.get_upcoming_events(days)
-                title = f"📅 Upcoming Events (Next {days} days)"
-            
-            if not events:
-                embed = discord.Embed(
-                    title=title,
-                    description="No events found! 🎉",
-                    color=discord.Color.green()
-                )
-                await channel.send(embed=embed)
-                return
+            view = 'today' if days == 0 else 'upcoming'
+            _, end = self.calendar_service.day_range(days)
             
-            embed = discord.Embed(title=title, color=discord.Color.blue())
-            
-            schedule_text = ""
-            current_date = None
-            
-            for event in events:
-                if event['title'].startswith('🟢') or event['title'].startswith('🔵'):
-                    continue
-                # Parse event date for grouping
-                from datetime import datetime
-                start_str = event['start']
-                if 'T' in start_str:
-                    event_date = datetime.fromisoformat(start_str.replace('Z', '+00:00')).date()
-                else:
-                    event_date = datetime.fromisoformat(start_str).date()
-                
-                # Add date header if changed (for multi-day view)
-                if days > 0 and current_date != event_date:
-                    current_date = event_date
-                    schedule_text += f"\n**{event_date.strftime('%Y-%m-%d (%A)')}**\n"
+            if days == 0 or self.calendar_service.is_warm(end):
+                # Events in memory: bring them up to date, then send the cached view or render it whole
+                await self.calendar_service.refresh(end)
+                messages = self.render_cache.get(self.calendar_service.version, self._view_key(view, days))
+                if messages is None:
+                    renderer = self._manual_renderer(days)
+                    renderer.add_groups(await self.calendar_service.get_events_by_day(days, refresh=False))
+                    messages = self._finish_schedule(renderer, empty_message="No events found! 🎉")
+                    self.render_cache.put(self.calendar_service.version, self._view_key(view, days), messages)
                 
-                schedule_text += f"🕐 **{event['time']}** - {event['title']}\n"
-                if event['location']:
-                    schedule_text += f"📍 {event['location']}\n"
-                if event['description']:
-                    desc = event['description'][:100] + "..." if len(event['description']) > 100 else event['description']
-                    schedule_text += f"📝 {desc}\n"
-                schedule_text += "\n"
-            
-            # Handle long messages
-            if len(schedule_text) > 4000:
-                chunks = self._split_text(schedule_text, 4000)
-                for i, chunk in enumerate(chunks):
-                    if i == 0:
-                        embed.description = chunk
-                        await channel.send(embed=embed)
-                    else:
-                        continuation_embed = discord.Embed(
-                            title=f"{title} (continued)",
-                            description=chunk,
-                            color=discord.Color.blue()
-                        )
-                        await channel.send(embed=continuation_embed)
+                for message in messages:
+                    await self._send(channel, **message)
             else:
-                embed.description = schedule_text
-                await channel.send(embed=embed)
-                
+                # Cold stores: stream pages so the first embed goes out before the last page arrives
+                await self._send_schedule(channel, self._manual_renderer(days),
+                                          self.calendar_service.iter_upcoming_events(days),
+                                          empty_message="No events found! 🎉")
+        
         except Exception as e:
             error_embed = discord.Embed(
                 title="❌ Calendar Error",
                 description=f"Error fetching calendar events: {str(e)}",
                 color=discord.Color.red()
             )
-            await channel.send(embed=error_embed)
-            print(f"Error in manual schedule: {e}")
+            await self._send(channel, embed=error_embed)
+            logger.error(f"Error in manual schedule: {e}", extra={'channel_id': channel.id})
     
-    def _split_text(self, text, max_length):
-        """Split text into chunks of max_length while preserving line breaks"""
-        lines = text.split('\n')
-        chunks = []
-        current_chunk = ""
-        
-        for line in lines:
-            if len(current_chunk + line + '\n') > max_length:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                    current_chunk = line + '\n'
-                else:
-                    # Single line is too long, force split
-                    current_chunk = line[:max_length-3] + "..."
-                    chunks.append(current_chunk)
-                    current_chunk = ""
-            else:
-                current_chunk += line + '\n'
+    def _manual_renderer(self, days):
+        """Renderer for today's schedule (days=0) or the next N days"""
+        title = "📅 Today's Schedule" if days == 0 else f"📅 Upcoming Events (Next {days} days)"
+        return ScheduleRenderer(title, show_dates=days > 0, skip_prefixes=('🟢', '🔵'),
+                                show_labels=self.calendar_service.show_labels, footer_length=len(DEGRADED_NOTICE))
+    
+    async def _send_schedule(self, channel, renderer, batches, empty_message):
+        """Render batches of (date, events) groups and send each message as soon as it is complete"""
+        async for groups in batches:
+            renderer.add_groups(groups)
+            for message in renderer.take_messages():
+                await self._send(channel, embeds=self._schedule_embeds(message))
         
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
+        for message in self._finish_schedule(renderer, empty_message):
+            await self._send(channel, **message)
+    
+    def _finish_schedule(self, renderer, empty_message):
+        """channel.send kwargs for the messages left in the renderer, or for an empty schedule"""
+        messages = renderer.finish()
+        if not renderer.event_count:
+            embed = discord.Embed(
+                title=renderer.title,
+                description=empty_message,
+                color=discord.Color.green()
+            )
+            self._mark_degraded([embed])
+            return [{'embed': embed}]
         
-        return chunks
+        embed_lists = [self._schedule_embeds(message) for message in messages]
+        if embed_lists:
+            self._mark_degraded(embed_lists[-1])
+        return [{'embeds': embeds} for embeds in embed_lists]
+    
+    async def _send(self, channel, **message):
+        """Send one message, recording Discord send latency"""
+        with SEND_LATENCY.time(path='command'):
+            await channel.send(**message)
+    
+    def _mark_degraded(self, embeds):
+        """Footnote the last embed when the events may be out of date"""
+        if self.calendar_service.degraded:
+            embeds[-1].set_footer(text=DEGRADED_NOTICE)
+    
+    def _schedule_embeds(self, message):
+        """Build the embeds for one message of (title, description) chunks"""
+        return [
+            discord.Embed(title=title, description=description, color=discord.Color.blue())
+            for title, description in message
+        ]
@@ -0,0 +1,161 @@
+"""
+Schedule expressions
+Cron-style, daily and fixed-interval schedules for the scheduler engine
+"""
+
+from datetime import datetime, timedelta
+import pytz
+
+# (minimum, maximum) for minute, hour, day of month, month, day of week
+CRON_FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+# Cron expressions always match within a few years (leap days included)
+MAX_SEARCH_DAYS = 366 * 8
+
+def localize(timezone, wall_time: datetime) -> datetime:
+    """
+    Attach a timezone to a naive local wall time, resolving DST transitions
+
+    Ambiguous times (clocks falling back) use the first occurrence, so a
+    schedule fires once; nonexistent times (clocks springing forward) are
+    shifted forward by the size of the gap.
+    """
+    try:
+        return timezone.localize(wall_time, is_dst=None)
+    except pytz.AmbiguousTimeError:
+        return timezone.localize(wall_time, is_dst=True)
+    except pytz.NonExistentTimeError:
+        return timezone.normalize(timezone.localize(wall_time, is_dst=False))
+
+def parse_cron_field(field: str, minimum: int, maximum: int) -> set[int]:
+    """Parse one cron field (*, */n, a-b, a-b/n, a,b,...) into the set of matching values"""
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step_str = part.split('/', 1)
+            step = int(step_str)
+            if step < 1:
+                raise ValueError(f"Invalid cron step: {step_str}")
+        
+        if part == '*':
+            start, end = minimum, maximum
+        elif '-' in part:
+            start_str, end_str = part.split('-', 1)
+            start, end = int(start_str), int(end_str)
+        else:
+            start = int(part)
+            end = maximum if step > 1 else start
+        
+        if start < minimum or end > maximum or start > end:
+            raise ValueError(f"Cron value out of range {minimum}-{maximum}: {part}")
+        values.update(range(start, end + 1, step))
+    return values
+
+class CronSchedule:
+    """
+    Standard 5-field cron expression: minute hour day-of-month month day-of-week
+    
+    Fields are matched against wall-clock time in the schedule's timezone.
+    """
+    
+    def __init__(self, expression: str, timezone=pytz.UTC):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        
+        self.expression = expression
+        self.timezone = timezone
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            sorted(parse_cron_field(field, *limits)) for field, limits in zip(fields, CRON_FIELD_RANGES)
+        )
+        self.days_set, self.months_set = set(self.days), set(self.months)
+        # Day of week accepts 7 as Sunday, like most cron implementations
+        self.weekdays_set = {weekday % 7 for weekday in self.weekdays}
+        # With both day fields restricted, a day matches if either does
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+    
+    def _day_matches(self, day: datetime) -> bool:
+        """Whether a calendar day matches the day-of-month/month/day-of-week fields"""
+        if day.month not in self.months_set:
+            return False
+        dom = day.day in self.days_set
+        dow = (day.weekday() + 1) % 7 in self.weekdays_set  # cron counts from Sunday
+        if self.any_day or self.any_weekday:
+            return dom and dow
+        return dom or dow
+    
+    def next_after(self, after: datetime) -> datetime:
+        """First matching minute strictly after an aware time, returned in UTC"""
+        # Search in local wall time, then convert the match back to an instant
+        wall_time = after.astimezone(self.timezone).replace(tzinfo=None)
+        while True:
+            wall_time = self.next_wall_time(wall_time)
+            instant = localize(self.timezone, wall_time).astimezone(pytz.UTC)
+            # A repeated wall time after clocks fall back can map before `after`
+            if instant > after:
+                return instant
+    
+    def next_wall_time(self, after: datetime) -> datetime:
+        """First matching naive wall time strictly after the given naive wall time"""
+        candidate = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        
+        for _ in range(MAX_SEARCH_DAYS):
+            if self._day_matches(candidate):
+                for hour in self.hours:
+                    if hour < candidate.hour:
+                        continue
+                    first_minute = candidate.minute if hour == candidate.hour else 0
+                    for minute in self.minutes:
+                        if minute >= first_minute:
+                            return candidate.replace(hour=hour, minute=minute)
+            candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+        
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+    
+    def with_timezone(self, timezone) -> 'CronSchedule':
+        """Same expression evaluated in another timezone"""
+        return CronSchedule(self.expression, timezone)
+    
+    def describe(self) -> str:
+        """Human readable form for status listings"""
+        return f"cron {self.expression}"
+
+class DailySchedule(CronSchedule):
+    """Once a day at a fixed hour and minute"""
+    
+    def __init__(self, hour: int, minute: int = 0, timezone=pytz.UTC):
+        super().__init__(f"{minute} {hour} * * *", timezone)
+        self.hour = hour
+        self.minute = minute
+    
+    def with_timezone(self, timezone) -> 'DailySchedule':
+        """Same time of day in another timezone"""
+        return DailySchedule(self.hour, self.minute, timezone)
+    
+    def describe(self) -> str:
+        """Human readable form for status listings"""
+        return f"{self.hour:02d}:{self.minute:02d}"
+
+class IntervalSchedule:
+    """Fixed interval between runs"""
+    
+    def __init__(self, seconds: float, timezone=pytz.UTC):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.interval = timedelta(seconds=seconds)
+        # Intervals are zone-independent; kept so every schedule reports a zone
+        self.timezone = timezone
+    
+    def next_after(self, after: datetime) -> datetime:
+        """Next run one interval after the given time"""
+        return after + self.interval
+    
+    def with_timezone(self, timezone) -> 'IntervalSchedule':
+        """Same interval, reported in another timezone"""
+        return IntervalSchedule(self.interval.total_seconds(), timezone)
+    
+    def describe(self) -> str:
+        """Human readable form for status listings"""
+        return f"every {self.interval.total_seconds():g}s"
@@ -0,0 +1,69 @@
+"""
+Day-bucketed event index
+Buckets store events by local date so day range views are simple slices
+"""
+
+from datetime import date, datetime, timedelta
+from .calendar_event import CalendarEvent
+
+class DayIndex:
+    """Events bucketed by local date over a rolling window"""
+    
+    def __init__(self, timezone, window_days: int = 31):
+        self.timezone = timezone
+        self.window_days = window_days
+        self.first_day: date | None = None
+        self.buckets: list[list[CalendarEvent]] = []
+        self.version = None
+    
+    def is_current(self, version, today: date) -> bool:
+        """Whether the index was built from this store version for this day"""
+        return self.version == version and self.first_day == today
+    
+    def covers(self, start_day: date, days: int) -> bool:
+        """Whether a day range falls inside the indexed window"""
+        if self.first_day is None:
+            return False
+        offset = (start_day - self.first_day).days
+        return offset >= 0 and offset + days <= self.window_days
+    
+    def rebuild(self, events, version, today: date):
+        """Bucket events by every local day they cover"""
+        self.first_day = today
+        self.version = version
+        self.buckets = [[] for _ in range(self.window_days)]
+        
+        # Buckets stay ordered by start time because events go in sorted
+        for event in sorted(events, key=lambda event: event.start):
+            first = event.start_day
+            # End is exclusive: an all-day event ending at midnight does not cover that day
+            last = max(first, (event.end - timedelta(microseconds=1)).astimezone(self.timezone).date())
+            
+            first_offset = max((first - today).days, 0)
+            last_offset = min((last - today).days, self.window_days - 1)
+            for offset in range(first_offset, last_offset + 1):
+                self.buckets[offset].append(event)
+    
+    def slice(self, start: datetime, end: datetime) -> list[tuple[date, datetime, CalendarEvent]]:
+        """
+        Return (date, start, event) entries overlapping [start, end), ordered by day
+        
+        Multi-day events are listed once, under the first day of the range
+        they cover. Runs in O(days + results).
+        """
+        start_day = start.astimezone(self.timezone).date()
+        end_day = (end - timedelta(microseconds=1)).astimezone(self.timezone).date()
+        first_offset = (start_day - self.first_day).days
+        last_offset = (end_day - self.first_day).days
+        
+        results = []
+        seen = set()
+        for offset in range(first_offset, last_offset + 1):
+            day = self.first_day + timedelta(days=offset)
+            for event in self.buckets[offset]:
+                if event.end <= start or event.start >= end or event.id in seen:
+                    continue
+                seen.add(event.id)
+                results.append((day, event.start, event))
+        
+        return results
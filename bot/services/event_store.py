@@ -0,0 +1,82 @@
+"""
+In-memory event store
+Holds a local copy of a calendar that is kept current with incremental sync
+"""
+
+from datetime import datetime
+from time import monotonic
+from .calendar_event import CalendarEvent
+
+class EventStore:
+    """Local copy of one calendar, refreshed with syncToken deltas"""
+    
+    def __init__(self, timezone, calendar: str = ''):
+        self.timezone = timezone
+        self.calendar = calendar
+        self.events: dict[str, CalendarEvent] = {}
+        self.sync_token: str | None = None
+        self.horizon: datetime | None = None  # end of the window covered by the last full sync
+        self.last_synced: float | None = None
+        self.version = 0
+        # Set when the API rejects the sync token; the events are served until a full sync replaces them
+        self.token_expired = False
+    
+    @property
+    def ready(self) -> bool:
+        """Whether a full sync has populated the store"""
+        return self.sync_token is not None
+    
+    def is_fresh(self, max_age: float) -> bool:
+        """Whether the store was synced within the last max_age seconds"""
+        if self.last_synced is None:
+            return False
+        return monotonic() - self.last_synced < max_age
+    
+    def covers(self, end: datetime) -> bool:
+        """Whether the last full sync window reaches the given time"""
+        return self.horizon is not None and end <= self.horizon
+    
+    def expire_sync_token(self):
+        """Force the next sync to be a full one, keeping the current events until it succeeds"""
+        self.token_expired = True
+    
+    def replace_all(self, events: list[dict], sync_token: str, horizon: datetime):
+        """Load the result of a full sync"""
+        self.events.clear()
+        for event in events:
+            self._put(event)
+        self.sync_token = sync_token
+        self.token_expired = False
+        self.horizon = horizon
+        self.last_synced = monotonic()
+        self.version += 1
+    
+    def apply_changes(self, events: list[dict], sync_token: str) -> int:
+        """Apply an incremental sync delta, returning the number of changed events"""
+        for event in events:
+            if event.get('status') == 'cancelled':
+                self.events.pop(event['id'], None)
+            else:
+                self._put(event)
+        
+        self.sync_token = sync_token
+        self.last_synced = monotonic()
+        if events:
+            self.version += 1
+        return len(events)
+    
+    def prune_before(self, cutoff: datetime):
+        """Forget events that ended before cutoff"""
+        expired = [event_id for event_id, event in self.events.items() if event.end <= cutoff]
+        for event_id in expired:
+            del self.events[event_id]
+    
+    def events_between(self, start: datetime, end: datetime) -> list[CalendarEvent]:
+        """Return events overlapping [start, end), ordered by start time"""
+        matches = [event for event in self.events.values() if event.start < end and event.end > start]
+        matches.sort(key=lambda event: event.start)
+        return matches
+    
+    def _put(self, event: dict):
+        """Parse and insert or replace a single raw API event"""
+        self.events[event['id']] = CalendarEvent.from_api(event, self.timezone, self.calendar)
@@ -0,0 +1,119 @@
+"""
+Fan-out dispatcher module
+Delivers one rendered payload to many channels within Discord's rate limits
+"""
+
+import asyncio
+import logging
+import os
+from time import monotonic
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+SEND_LATENCY = registry.histogram('discord_send_seconds', 'Latency of Discord channel.send calls')
+SEND_FAILURES = registry.counter('discord_send_failures_total', 'Discord channel.send calls that failed')
+
+class RateLimiter:
+    """Token bucket pacing requests below Discord's global rate limit"""
+    
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a request token is available"""
+        async with self._lock:
+            while True:
+                now = monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class FanoutDispatcher:
+    """
+    Sends the same messages to many channels with a bounded worker pool
+    
+    A shared token bucket keeps the fan-out under the global request rate;
+    discord.py's HTTP client still handles per-route buckets and 429s. Each
+    channel gets its messages in order, and the whole fan-out is cut off
+    after a deadline so it finishes in a predictable window.
+    """
+    
+    def __init__(self, max_workers: int | None = None, rate_per_second: float | None = None,
+                 timeout: float | None = None):
+        self.max_workers = max_workers or int(os.getenv('FANOUT_WORKERS', '10'))
+        self.rate_per_second = rate_per_second or float(os.getenv('FANOUT_RATE', '40'))
+        self.timeout = timeout or float(os.getenv('FANOUT_TIMEOUT', '300'))
+        self.rate_limiter = RateLimiter(self.rate_per_second)
+    
+    async def deliver(self, channels: list, messages: list[dict]) -> dict:
+        """
+        Send every message (channel.send kwargs) to every channel
+        
+        Returns a report with delivered/failed channel ids and per-channel
+        delivery latency in seconds, measured from the start of the fan-out.
+        """
+        started = monotonic()
+        queue = asyncio.Queue()
+        for channel in channels:
+            queue.put_nowait(channel)
+        
+        report = {'delivered': [], 'failed': [], 'latencies': {}}
+        estimate = len(channels) * len(messages) / self.rate_per_second
+        logger.info(f"Fan-out to {len(channels)} channels ({len(messages)} messages each), estimated {estimate:.1f}s",
+                    extra={'channels': len(channels), 'messages': len(messages)})
+        
+        async def worker():
+            while True:
+                try:
+                    channel = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    for message in messages:
+                        await self.rate_limiter.acquire()
+                        sent = monotonic()
+                        await channel.send(**message)
+                        SEND_LATENCY.observe(monotonic() - sent, path='fanout')
+                    report['delivered'].append(channel.id)
+                    report['latencies'][channel.id] = monotonic() - started
+                except Exception as e:
+                    SEND_FAILURES.inc(path='fanout')
+                    report['failed'].append(channel.id)
+                    logger.warning(f"Failed to deliver to channel {channel.id}: {e}", extra={'channel_id': channel.id})
+        
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.max_workers, len(channels)))]
+        _, pending = await asyncio.wait(workers, timeout=self.timeout) if workers else (set(), set())
+        
+        if pending:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            
+            # Anything not delivered before the deadline counts as failed
+            finished = set(report['delivered']) | set(report['failed'])
+            report['failed'].extend(channel.id for channel in channels if channel.id not in finished)
+            logger.warning(f"Fan-out deadline of {self.timeout:g}s reached", extra={'undelivered': len(channels) - len(finished)})
+        
+        report['elapsed'] = monotonic() - started
+        logger.info(self.summarize(report), extra={'delivered': len(report['delivered']), 'failed': len(report['failed'])})
+        return report
+    
+    @staticmethod
+    def summarize(report: dict) -> str:
+        """One-line summary with delivery latency percentiles"""
+        latencies = sorted(report['latencies'].values())
+        summary = (f"Fan-out finished in {report['elapsed']:.2f}s: "
+                   f"{len(report['delivered'])} delivered, {len(report['failed'])} failed")
+        if latencies:
+            p50 = latencies[len(latencies) // 2]
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            summary += f" (latency p50 {p50:.2f}s, p95 {p95:.2f}s, max {latencies[-1]:.2f}s)"
+        return summary
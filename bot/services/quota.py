@@ -0,0 +1,151 @@
+"""
+Calendar API quota module
+Client-side rate limiting, retry with backoff and a circuit breaker for upstream requests
+"""
+
+import asyncio
+import logging
+import os
+import random
+from time import monotonic
+import aiohttp
+from utils.metrics import registry
+from .fanout import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Rate limiting (403 with a rate limit reason, 429) and transient server errors are worth retrying
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded', 'quotaExceeded'}
+
+RETRIES = registry.counter('calendar_api_retries_total', 'Calendar API requests retried, by status')
+REJECTED = registry.counter('calendar_api_rejected_total', 'Calendar API requests failed fast by the open circuit')
+CIRCUIT_OPEN = registry.gauge('calendar_api_circuit_open', '1 while the Calendar API circuit breaker is open')
+QUOTA_WAIT = registry.histogram('calendar_api_quota_wait_seconds', 'Time spent waiting for a Calendar API quota token')
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit breaker is open"""
+    
+    def __init__(self, retry_in: float):
+        super().__init__(f"circuit breaker open, retrying in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a failed request may succeed if sent again"""
+    status = getattr(error, 'status', None)
+    if status is not None:
+        if status == 403:
+            # Other 403s (forbidden, daily limit, ...) fail the same way when sent again
+            return getattr(error, 'reason', None) in RATE_LIMIT_REASONS
+        return status in RETRYABLE_STATUSES
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated upstream failures
+    
+    After failure_threshold consecutive failed calls the circuit opens and
+    calls are rejected for reset_timeout seconds. Then a single trial call
+    is let through and the timer restarts: success closes the circuit,
+    failure opens it again.
+    """
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+    
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently being rejected"""
+        return self.opened_at is not None
+    
+    def allow(self):
+        """Raise CircuitOpenError unless a call may go upstream now"""
+        if self.opened_at is None:
+            return
+        
+        remaining = self.opened_at + self.reset_timeout - monotonic()
+        if remaining > 0:
+            REJECTED.inc()
+            raise CircuitOpenError(remaining)
+        
+        # Half-open: this call is the trial. Restarting the timer keeps rejecting
+        # other calls until it succeeds, or for another reset_timeout if it never does
+        self.opened_at = monotonic()
+    
+    def record_success(self):
+        """A call succeeded: close the circuit"""
+        self.failures = 0
+        if self.opened_at is not None:
+            self.opened_at = None
+            CIRCUIT_OPEN.set(0)
+            logger.info("Calendar API circuit closed")
+    
+    def record_failure(self):
+        """A call failed after its retries: open the circuit at the threshold"""
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = monotonic()
+            CIRCUIT_OPEN.set(1)
+            logger.warning(f"Calendar API circuit open for {self.reset_timeout:g}s after {self.failures} failures",
+                           extra={'failures': self.failures, 'reset_timeout': self.reset_timeout})
+
+class QuotaManager:
+    """
+    Paces, retries and guards every upstream Calendar API request
+    
+    A token bucket keeps requests within the API key's quota. Rate limit
+    and transient errors are retried with exponential backoff and full
+    jitter, waiting at least as long as Retry-After asks. Calls that still
+    fail count towards the circuit breaker.
+    """
+    
+    def __init__(self, rate: float | None = None, burst: int | None = None, max_retries: int | None = None,
+                 backoff_base: float | None = None, backoff_max: float | None = None,
+                 breaker: CircuitBreaker | None = None):
+        self.rate = rate or float(os.getenv('CALENDAR_QUOTA_RATE', '10'))
+        self.rate_limiter = RateLimiter(self.rate, burst or int(os.getenv('CALENDAR_QUOTA_BURST', '20')))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('CALENDAR_MAX_RETRIES', '3'))
+        self.backoff_base = backoff_base or float(os.getenv('CALENDAR_BACKOFF_BASE', '0.5'))
+        self.backoff_max = backoff_max or float(os.getenv('CALENDAR_BACKOFF_MAX', '30'))
+        self.breaker = breaker or CircuitBreaker(
+            int(os.getenv('CALENDAR_BREAKER_THRESHOLD', '5')),
+            float(os.getenv('CALENDAR_BREAKER_RESET', '60'))
+        )
+    
+    async def call(self, request):
+        """Await request() within quota, retrying transient failures"""
+        self.breaker.allow()
+        
+        attempt = 0
+        while True:
+            with QUOTA_WAIT.time():
+                await self.rate_limiter.acquire()
+            try:
+                result = await request()
+            except Exception as e:
+                if not is_retryable(e):
+                    # The API answered; the request itself was wrong (404, 410, ...)
+                    self.breaker.record_success()
+                    raise
+                
+                delay = self.backoff_delay(attempt, getattr(e, 'retry_after', None))
+                if attempt >= self.max_retries or delay > self.backoff_max:
+                    self.breaker.record_failure()
+                    raise
+                
+                RETRIES.inc(status=getattr(e, 'status', None) or type(e).__name__)
+                attempt += 1
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+    
+    def backoff_delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
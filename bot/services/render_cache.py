@@ -0,0 +1,57 @@
+"""
+Render cache module
+Ready-to-send schedule messages, reused until the calendars change
+"""
+
+import os
+from collections import OrderedDict
+from utils.metrics import registry
+
+CACHE_REQUESTS = registry.counter('render_cache_requests_total', 'Schedule render cache lookups, by view and result')
+CACHE_EVICTIONS = registry.counter('render_cache_evictions_total', 'Rendered schedules dropped, by reason')
+
+class RenderCache:
+    """
+    Bounded LRU of rendered schedule messages for one calendar version
+    
+    Keys describe the view (view type, date range, timezone, ...); the
+    calendar version is tracked separately, and the first lookup or store
+    under a new version drops everything rendered from older events.
+    """
+    
+    def __init__(self, max_entries: int | None = None):
+        self.max_entries = max_entries or int(os.getenv('RENDER_CACHE_SIZE', '128'))
+        self.version = None
+        self._entries: OrderedDict[tuple, list] = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, version, key: tuple) -> list | None:
+        """Rendered messages for a view at this calendar version, if cached"""
+        self._check_version(version)
+        messages = self._entries.get(key)
+        if messages is None:
+            CACHE_REQUESTS.inc(view=key[0], result='miss')
+            return None
+        
+        self._entries.move_to_end(key)
+        CACHE_REQUESTS.inc(view=key[0], result='hit')
+        return messages
+    
+    def put(self, version, key: tuple, messages: list):
+        """Store rendered messages, evicting the least recently used view when full"""
+        self._check_version(version)
+        self._entries[key] = messages
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            CACHE_EVICTIONS.inc(reason='size')
+    
+    def _check_version(self, version):
+        """Invalidate every entry once the events have changed"""
+        if version != self.version:
+            if self._entries:
+                CACHE_EVICTIONS.inc(len(self._entries), reason='version')
+                self._entries.clear()
+            self.version = version
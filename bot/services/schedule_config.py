@@ -5,13 +5,14 @@ Centralized configuration for all scheduled tasks
 
 from collections.abc import Callable
 import os
+from .calendar_service import GoogleCalendarService
 from .calendar_tasks import CalendarTasks
 
 class ScheduleConfig:
     """Configuration for scheduled tasks"""
     
-    def __init__(self):
-        self.calendar_tasks = CalendarTasks()
+    def __init__(self, calendar_service: GoogleCalendarService = None):
+        self.calendar_tasks = CalendarTasks(calendar_service)
     
     def get_scheduled_tasks(self) -> list[dict[str, any]]:
         """
@@ -21,12 +22,18 @@ class ScheduleConfig:
         List of task configurations with format:
         {
             'name': 'task_name',
-            'func': callable_function,
+            'func': callable_function,  # awaited with {timezone: [channel, ...]} of subscribed channels
             'hour': int,
             'minute': int,
             'enabled': bool,
             'description': 'Task description'
         }
+        Instead of 'hour'/'minute', a task may set 'cron' (5-field cron
+        expression) or 'interval' (seconds between runs), and 'timezone' to
+        run on a zone other than TIMEZONE (guilds can still override it).
+        An optional 'prepare' callable runs DIGEST_PREFETCH_LEAD seconds
+        before each run to do slow work ahead of time. Both are called with
+        the channels due at that instant grouped by their guild's timezone.
         """
         
         # Default schedule times from environment
@@ -37,6 +44,7 @@ class ScheduleConfig:
             {
                 'name': 'daily_calendar',
                 'func': self.calendar_tasks.daily_schedule_notification,
+                'prepare': self.calendar_tasks.prepare_daily_schedule,
                 'hour': default_hour,
                 'minute': default_minute,
                 'enabled': True,
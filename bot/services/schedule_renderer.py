@@ -0,0 +1,171 @@
+"""
+Schedule renderer module
+Turns grouped calendar events into embed-sized description chunks in one pass
+"""
+
+# Discord embed limits
+TITLE_LIMIT = 256
+DESCRIPTION_LIMIT = 4096
+FIELD_LIMIT = 25
+EMBED_TOTAL_LIMIT = 6000
+EMBEDS_PER_MESSAGE = 10
+
+DESCRIPTION_PREVIEW_LENGTH = 100
+
+class ScheduleRenderer:
+    """
+    Incrementally renders (date, events) groups into Discord messages
+    
+    Lines are buffered in a list with a running length, so rendering and
+    splitting stay linear in the output size. Chunks are packed into
+    messages of up to ten embeds within the 6000-character message total,
+    and completed messages can be taken while more groups are still
+    arriving.
+    """
+    
+    def __init__(self, title: str, show_dates: bool = False, skip_prefixes: tuple[str, ...] = (),
+                 chunk_limit: int = DESCRIPTION_LIMIT, show_labels: bool = False, footer_length: int = 0,
+                 timezone=None):
+        self.title = title[:TITLE_LIMIT]
+        self.show_dates = show_dates
+        self.show_labels = show_labels
+        # Event times are shown on this zone's clock (the calendar timezone if None)
+        self.timezone = timezone
+        self.skip_prefixes = skip_prefixes
+        self.max_chunk = min(chunk_limit, DESCRIPTION_LIMIT)
+        # Room kept in every message for a footer the caller may add afterwards
+        self.footer_length = footer_length
+        self.event_count = 0
+        
+        self._lines: list[str] = []
+        self._length = 0
+        self._current_date = None
+        
+        # Messages are lists of (title, description) embeds
+        self._messages: list[list[tuple[str | None, str]]] = []
+        self._message: list[tuple[str | None, str]] = []
+        self._message_length = 0
+        self._embed_count = 0
+        self._limit = self._chunk_limit()
+    
+    def add_groups(self, groups):
+        """Render a batch of (date, CalendarEvent list) groups"""
+        for event_date, events in groups:
+            for event in events:
+                if self.skip_prefixes and event.title.startswith(self.skip_prefixes):
+                    continue
+                
+                # Add date header if changed (for multi-day view)
+                if self.show_dates and event_date != self._current_date:
+                    self._current_date = event_date
+                    self._add_line('')
+                    self._add_line(f"**{event_date.strftime('%Y-%m-%d (%A)')}**")
+                
+                self._add_event(event)
+                self.event_count += 1
+    
+    def take_messages(self) -> list[list[tuple[str | None, str]]]:
+        """Return the messages completed so far"""
+        messages = self._messages
+        self._messages = []
+        return messages
+    
+    def finish(self) -> list[list[tuple[str | None, str]]]:
+        """Flush the last partial chunk and message and return all remaining messages"""
+        self._flush()
+        self._close_message()
+        return self.take_messages()
+    
+    def _add_event(self, event):
+        """Render the lines for a single event"""
+        label = f"[{event.calendar}] " if self.show_labels and event.calendar else ""
+        time = event.time if self.timezone is None else event.time_in(self.timezone)
+        self._add_line(f"🕐 **{time}** - {label}{event.title}")
+        if event.location:
+            self._add_line(f"📍 {event.location}")
+        if event.description:
+            desc = event.description
+            if len(desc) > DESCRIPTION_PREVIEW_LENGTH:
+                desc = desc[:DESCRIPTION_PREVIEW_LENGTH] + "..."
+            self._add_line(f"📝 {desc}")
+        self._add_line('')
+    
+    def _add_line(self, line: str):
+        """Append a line, starting a new chunk or message when it would overflow"""
+        added = len(line) + 1 if self._lines else len(line)
+        if self._length + added > self._limit:
+            self._flush()
+            added = len(line)
+            
+            # Not enough room left in this message: start the next one
+            if added > self._limit:
+                self._close_message()
+        
+        if len(line) > self._limit:
+            # Single line is too long, force split
+            line = line[:self._limit - 3] + "..."
+            added = len(line)
+        
+        # Chunks never start with blank lines
+        if not self._lines and not line:
+            return
+        
+        self._lines.append(line)
+        self._length += added
+    
+    def _next_title(self) -> str | None:
+        """Title for the next embed: only the first embed of each message has one"""
+        if self._message:
+            return None
+        if self._messages or self._embed_count:
+            return continued_title(self.title)
+        return self.title
+    
+    def _chunk_limit(self) -> int:
+        """Largest description the next embed can hold"""
+        title = self._next_title() or ''
+        return min(self.max_chunk, EMBED_TOTAL_LIMIT - self._message_length - len(title) - self.footer_length)
+    
+    def _flush(self):
+        """Close the current chunk into the current message"""
+        text = '\n'.join(self._lines).strip()
+        self._lines = []
+        self._length = 0
+        
+        if text:
+            title = self._next_title()
+            self._message.append((title, text))
+            self._message_length += len(title or '') + len(text)
+            self._embed_count += 1
+            if len(self._message) >= EMBEDS_PER_MESSAGE:
+                self._close_message()
+        
+        self._limit = self._chunk_limit()
+    
+    def _close_message(self):
+        """Complete the current message"""
+        if self._message:
+            self._messages.append(self._message)
+        self._message = []
+        self._message_length = 0
+        self._limit = self._chunk_limit()
+
+def pack_fields(title: str, fields: list[tuple[str, str]]) -> list[list[tuple[str, str]]]:
+    """Split (name, value) embed fields into groups that fit one embed each"""
+    budget = EMBED_TOTAL_LIMIT - len(continued_title(title[:TITLE_LIMIT]))
+    groups = [[]]
+    length = 0
+    
+    for name, value in fields:
+        size = len(name) + len(value)
+        if groups[-1] and (len(groups[-1]) >= FIELD_LIMIT or length + size > budget):
+            groups.append([])
+            length = 0
+        groups[-1].append((name, value))
+        length += size
+    
+    return groups
+
+def continued_title(title: str) -> str:
+    """Title used for every embed after the first"""
+    return f"{title} (continued)"[:TITLE_LIMIT]
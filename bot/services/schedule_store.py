@@ -0,0 +1,170 @@
+"""
+Schedule store module
+Persists scheduler settings and notification channels in a local SQLite database
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+from time import perf_counter
+
+logger = logging.getLogger(__name__)
+
+# Guild id stored for settings that are not tied to a guild (DMs, task defaults)
+NO_GUILD = 0
+
+# Task name stored for guild-wide settings (timezone)
+GUILD_WIDE = ''
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedule_settings (
+    guild_id INTEGER NOT NULL,
+    task_name TEXT NOT NULL,
+    channel_id INTEGER,
+    hour INTEGER,
+    minute INTEGER,
+    enabled INTEGER,
+    timezone TEXT,
+    PRIMARY KEY (guild_id, task_name)
+);
+CREATE INDEX IF NOT EXISTS idx_schedule_settings_task ON schedule_settings (task_name);
+CREATE INDEX IF NOT EXISTS idx_schedule_settings_channel ON schedule_settings (channel_id);
+"""
+
+COLUMNS = ('channel_id', 'hour', 'minute', 'enabled', 'timezone')
+
+class ScheduleStore:
+    """
+    SQLite-backed store for scheduler configuration
+    
+    One row per (guild, task) holds whichever settings were changed for it,
+    so startup restores everything with a single query. Changes are merged
+    in memory and written shortly after in one transaction, keeping
+    commands from waiting on disk.
+    """
+    
+    def __init__(self, path: str | None = None, flush_delay: float | None = None):
+        self.path = path or os.getenv('SCHEDULE_DB_PATH', 'schedules.db')
+        self.flush_delay = flush_delay if flush_delay is not None else float(os.getenv('SCHEDULE_DB_FLUSH_DELAY', '0.5'))
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[int, str], dict[str, object]] = {}
+        self._flush_task: asyncio.Task | None = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use"""
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.executescript(SCHEMA)
+        return self._connection
+    
+    def load(self) -> list[dict[str, object]]:
+        """Read every saved row in one query"""
+        started = perf_counter()
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT guild_id, task_name, {', '.join(COLUMNS)} FROM schedule_settings"
+            ).fetchall()
+        
+        settings = []
+        for guild_id, task_name, *values in rows:
+            row = {'guild_id': None if guild_id == NO_GUILD else guild_id, 'task_name': task_name}
+            row.update(zip(COLUMNS, values))
+            settings.append(row)
+        
+        logger.info(f"Loaded {len(settings)} schedule settings from {self.path} in {(perf_counter() - started) * 1000:.1f}ms",
+                    extra={'settings': len(settings)})
+        return settings
+    
+    def save(self, guild_id: int | None, task_name: str = GUILD_WIDE, **values):
+        """Queue changed settings for a (guild, task) row"""
+        unknown = set(values) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown schedule settings: {', '.join(sorted(unknown))}")
+        
+        key = (NO_GUILD if guild_id is None else guild_id, task_name)
+        self._pending.setdefault(key, {}).update(values)
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, shutdown): write straight away
+            self.flush()
+            return
+        
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_later())
+    
+    async def _flush_later(self):
+        """Collect changes for a short while, then write them off the event loop until none are left"""
+        await asyncio.sleep(self.flush_delay)
+        while self._pending:
+            # Taken on the loop thread, so save() never races with the writer
+            pending = self._take_pending()
+            try:
+                await asyncio.to_thread(self._write, pending)
+            except sqlite3.Error as e:
+                self._requeue(pending, e)
+                return
+    
+    def flush(self):
+        """Write all queued changes in one transaction"""
+        pending = self._take_pending()
+        if not pending:
+            return
+        try:
+            self._write(pending)
+        except sqlite3.Error as e:
+            self._requeue(pending, e)
+    
+    def _take_pending(self) -> dict[tuple[int, str], dict[str, object]]:
+        """Hand over the queued changes, leaving an empty queue for new saves"""
+        pending, self._pending = self._pending, {}
+        return pending
+    
+    def _requeue(self, pending: dict, error: Exception):
+        """Keep changes that failed to write for the next flush, under any newer values"""
+        for key, values in pending.items():
+            self._pending[key] = {**values, **self._pending.get(key, {})}
+        logger.error(f"Error saving schedule settings: {error}", extra={'pending': len(self._pending)})
+    
+    def _write(self, pending: dict[tuple[int, str], dict[str, object]]):
+        """Upsert a snapshot of changes in one transaction (runs on a worker thread)"""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                for (guild_id, task_name), values in pending.items():
+                    columns = ', '.join(values)
+                    placeholders = ', '.join('?' for _ in values)
+                    updates = ', '.join(f"{column} = excluded.{column}" for column in values)
+                    connection.execute(
+                        f"INSERT INTO schedule_settings (guild_id, task_name, {columns}) "
+                        f"VALUES (?, ?, {placeholders}) "
+                        f"ON CONFLICT (guild_id, task_name) DO UPDATE SET {updates}",
+                        (guild_id, task_name, *values.values())
+                    )
+    
+    async def close(self):
+        """Write any queued changes and close the database"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        
+        pending = self._take_pending()
+        if pending:
+            try:
+                await asyncio.to_thread(self._write, pending)
+            except sqlite3.Error as e:
+                self._requeue(pending, e)
+        
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -1,149 +1,521 @@
 import asyncio
+import heapq
+import logging
 import os
-from datetime import datetime, time
+from datetime import datetime, timedelta
 from collections.abc import Callable
+from itertools import count
+from time import perf_counter
 from typing import Any
 import pytz
-from discord.ext import tasks
+from utils.metrics import registry
+from .cron import CronSchedule, DailySchedule, IntervalSchedule
+from .schedule_store import GUILD_WIDE, ScheduleStore
+from .task_registry import GuildTask, TaskRegistry
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on a single sleep so wall-clock jumps are noticed promptly
+MAX_SLEEP_SECONDS = 60
+
+FIRE_DELAY = registry.histogram('scheduler_fire_delay_seconds', 'Delay between target and actual run time')
+TASK_LATENCY = registry.histogram('scheduler_task_seconds', 'Run time of scheduled task functions')
+TASK_ERRORS = registry.counter('scheduler_task_errors_total', 'Scheduled task runs that raised')
+HEAP_ENTRIES = registry.gauge('scheduler_heap_entries', 'Entries in the scheduler heap, stale ones included')
+
+class ScheduleSlot:
+    """One distinct schedule of a task: fires for every guild whose copy runs on it"""
+    def __init__(self, task: 'ScheduledTask', schedule):
+        self.task = task
+        self.schedule = schedule
+        self.next_run: datetime | None = None
+        # Bumped on every reschedule; heap entries with an old generation are stale
+        self.generation = 0
+        self.entries = 0  # live heap entries (fire and prepare)
+    
+    @property
+    def key(self) -> str:
+        """Identity of the slot's schedule within its task"""
+        return slot_key(self.schedule)
+
+def slot_key(schedule, timezone=None) -> str:
+    """Guilds whose schedules share a key share a slot (timezone overrides the schedule's own)"""
+    return f"{schedule.describe()} {(timezone or schedule.timezone).zone}"
 
 class ScheduledTask:
     """Represents a scheduled task"""
-    def __init__(self, name: str, func: Callable, hour: int, minute: int = 0, enabled: bool = True):
+    def __init__(self, name: str, func: Callable, schedule, enabled: bool = True, prepare: Callable | None = None):
         self.name = name
         self.func = func
-        self.hour = hour
-        self.minute = minute
+        self.prepare = prepare  # optional warm-up run a lead time before each fire
+        self.schedule = schedule  # in the task's default timezone
         self.enabled = enabled
-        self.task = None
+        self.slots: dict[str, ScheduleSlot] = {}  # slot key -> slot
+        self.members: dict[str, dict[int | None, GuildTask]] = {}  # slot key -> subscribed guild copies
     
-    def start(self):
-        """Start this scheduled task"""
-        if self.task and not self.task.is_running():
-            self.task.start()
+    @property
+    def next_run(self) -> datetime | None:
+        """Earliest upcoming run over all of the task's slots"""
+        runs = [slot.next_run for slot in self.slots.values() if slot.next_run is not None]
+        return min(runs) if runs else None
     
-    def stop(self):
-        """Stop this scheduled task"""
-        if self.task and self.task.is_running():
-            self.task.cancel()
+    @property
+    def hour(self) -> int | None:
+        """Hour of a daily schedule (None for cron and interval schedules)"""
+        return getattr(self.schedule, 'hour', None)
+    
+    @property
+    def minute(self) -> int | None:
+        """Minute of a daily schedule (None for cron and interval schedules)"""
+        return getattr(self.schedule, 'minute', None)
 
 class SchedulerService:
-    """Generic scheduler service for managing multiple scheduled tasks"""
+    """
+    Generic scheduler service for managing multiple scheduled tasks
+    
+    A single engine coroutine sleeps until the earliest next-fire time in a
+    min-heap, so adding, removing or rescheduling a task is O(log n) and the
+    process runs one background task however many tasks are registered.
     
-    def __init__(self, bot):
+    Each guild has its own copy of a task in a (guild, task) registry, with
+    its own channel, enabled flag and optionally time and timezone. A task
+    keeps one heap slot per distinct schedule in use, and everything due at
+    the same UTC instant is handled in a single wake-up, with one call per
+    task function over all of the channels due, grouped by the timezone
+    their guilds run on ({timezone: [channel, ...]}).
+    
+    With a store, changes made through commands are written through to it
+    and restored by load_settings() after a restart.
+    
+    Tasks with a prepare function get a second heap entry prefetch_lead
+    seconds before each fire time, so slow work (fetching, rendering) is
+    done ahead and the fire itself only has to send.
+    """
+    
+    def __init__(self, bot, store: ScheduleStore | None = None):
         self.bot = bot
+        self.store = store
         self.timezone = pytz.timezone(os.getenv('TIMEZONE', 'Asia/Seoul'))
         self.tasks: dict[str, ScheduledTask] = {}
-        self.notification_channels: dict[str, int] = {}  # task_name -> channel_id
+        self.registry = TaskRegistry()
+        self.guild_timezones: dict[int | None, Any] = {}  # guild_id -> timezone overriding the task default
+        self.prefetch_lead = timedelta(seconds=float(os.getenv('DIGEST_PREFETCH_LEAD', '120')))
+        
+        # (run_time, seq, generation, slot, is_prepare)
+        self._heap: list[tuple[datetime, int, int, ScheduleSlot, bool]] = []
+        self._sequence = count()
+        self._stale = 0  # invalidated entries still in the heap
+        self._engine: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._jobs: set[asyncio.Task] = set()  # in-flight task runs
     
-    def add_task(self, name: str, func: Callable, hour: int, minute: int = 0, enabled: bool = True):
-        """Add a new scheduled task"""
+    @property
+    def running(self) -> bool:
+        """Whether the engine coroutine is active"""
+        return self._engine is not None and not self._engine.done()
+    
+    def add_task(self, name: str, func: Callable, hour: int | None = None, minute: int = 0, enabled: bool = True,
+                 cron: str | None = None, interval: float | None = None, timezone: str | None = None,
+                 prepare: Callable | None = None):
+        """Add a new scheduled task (daily hour:minute, cron expression or interval in seconds)"""
         if name in self.tasks:
-            print(f"Task '{name}' already exists. Replacing...")
+            logger.warning(f"Task '{name}' already exists. Replacing...")
             self.remove_task(name)
         
-        scheduled_task = ScheduledTask(name, func, hour, minute, enabled)
+        # Wall-clock times are local to the task's timezone (TIMEZONE by default)
+        task_timezone = pytz.timezone(timezone) if timezone else self.timezone
+        if cron:
+            schedule = CronSchedule(cron, task_timezone)
+        elif interval:
+            schedule = IntervalSchedule(interval, task_timezone)
+        else:
+            schedule = DailySchedule(hour, minute, task_timezone)
         
-        # Create the discord.py task loop
-        @tasks.loop(time=time(hour=hour, minute=minute))
-        async def task_loop():
-            if scheduled_task.enabled:
-                try:
-                    channel_id = self.notification_channels.get(name)
-                    if channel_id:
-                        channel = self.bot.get_channel(channel_id)
-                        await func(channel)
-                    else:
-                        await func(None)
-                except Exception as e:
-                    print(f"Error in scheduled task '{name}': {e}")
-        
-        @task_loop.before_loop
-        async def before_task():
-            await self.bot.wait_until_ready()
-        
-        scheduled_task.task = task_loop
+        scheduled_task = ScheduledTask(name, func, schedule, enabled, prepare)
         self.tasks[name] = scheduled_task
+        self._rebuild_members(scheduled_task)
+        if enabled and self.running:
+            self._schedule_task(scheduled_task)
         
-        print(f"Added scheduled task: {name} at {hour:02d}:{minute:02d}")
+        logger.info(f"Added scheduled task: {name} at {schedule.describe()} ({task_timezone.zone})", extra={'task': name})
         return scheduled_task
     
     def remove_task(self, name: str):
         """Remove a scheduled task"""
         if name in self.tasks:
-            self.tasks[name].stop()
-            del self.tasks[name]
-            print(f"Removed scheduled task: {name}")
+            self._unschedule_task(self.tasks.pop(name))
+            logger.info(f"Removed scheduled task: {name}", extra={'task': name})
     
-    def start_task(self, name: str):
-        """Start a specific task"""
-        if name in self.tasks:
-            self.tasks[name].enabled = True
-            self.tasks[name].start()
-            print(f"Started task: {name}")
+    def has_task(self, name: str) -> bool:
+        """Whether a task with this name is configured"""
+        return name in self.tasks
     
-    def stop_task(self, name: str):
-        """Stop a specific task"""
-        if name in self.tasks:
-            self.tasks[name].enabled = False
-            self.tasks[name].stop()
-            print(f"Stopped task: {name}")
+    def task_names(self) -> list[str]:
+        """Names of all configured tasks"""
+        return list(self.tasks)
+    
+    def start_task(self, name: str, guild_id: int | None = None):
+        """Start a specific task, or only a guild's copy of it"""
+        if name not in self.tasks:
+            return
+        
+        task = self.tasks[name]
+        if guild_id is None:
+            task.enabled = True
+            if self.running and task.next_run is None:
+                self._schedule_task(task)
+        else:
+            self.registry.ensure(guild_id, name).enabled = True
+            self._update_guild(task, guild_id)
+        self._save(guild_id, name, enabled=1)
+        logger.info(f"Started task: {name}", extra={'task': name, 'guild_id': guild_id})
+    
+    def stop_task(self, name: str, guild_id: int | None = None):
+        """Stop a specific task, or only a guild's copy of it"""
+        if name not in self.tasks:
+            return
+        
+        task = self.tasks[name]
+        if guild_id is None:
+            task.enabled = False
+            self._unschedule_task(task)
+        else:
+            self.registry.ensure(guild_id, name).enabled = False
+            self._update_guild(task, guild_id)
+        self._save(guild_id, name, enabled=0)
+        logger.info(f"Stopped task: {name}", extra={'task': name, 'guild_id': guild_id})
     
     def start_all(self):
-        """Start all scheduled tasks"""
+        """Start the engine and schedule all enabled tasks"""
+        if not self.running:
+            self._wakeup = asyncio.Event()
+            self._engine = asyncio.create_task(self._run())
+        
         for task in self.tasks.values():
-            if task.enabled:
-                task.start()
-        print(f"Started {len(self.tasks)} scheduled tasks")
+            if task.enabled and task.next_run is None:
+                self._schedule_task(task)
+        logger.info(f"Started {len(self.tasks)} scheduled tasks")
     
     def stop_all(self):
-        """Stop all scheduled tasks"""
+        """Stop the engine and unschedule all tasks"""
         for task in self.tasks.values():
-            task.stop()
-        print("Stopped all scheduled tasks")
-    
-    def set_notification_channel(self, task_name: str, channel_id: int):
-        """Set notification channel for a specific task"""
-        self.notification_channels[task_name] = channel_id
-        print(f"Set notification channel for '{task_name}': {channel_id}")
-    
-    def list_tasks(self) -> list[dict[str, Any]]:
-        """Get list of all scheduled tasks"""
-        task_list = []
-        for name, task in self.tasks.items():
-            task_list.append({
-                'name': name,
-                'time': f"{task.hour:02d}:{task.minute:02d}",
-                'enabled': task.enabled,
-                'running': task.task.is_running() if task.task else False,
-                'channel_id': self.notification_channels.get(name)
-            })
-        return task_list
-    
-    def update_task_time(self, name: str, hour: int, minute: int):
-        """Update the time for a specific task"""
+            self._unschedule_task(task)
+        self._heap.clear()
+        self._stale = 0
+        if self.running:
+            self._engine.cancel()
+        self._engine = None
+        logger.info("Stopped all scheduled tasks")
+    
+    def set_notification_channel(self, task_name: str, channel_id: int, guild_id: int | None = None):
+        """Set a guild's notification channel for a specific task"""
+        self.registry.ensure(guild_id, task_name).channel_id = channel_id
+        self._update_guild(self.tasks.get(task_name), guild_id)
+        self._save(guild_id, task_name, channel_id=channel_id)
+        logger.info(f"Set notification channel for '{task_name}'", extra={'task': task_name, 'guild_id': guild_id, 'channel_id': channel_id})
+    
+    def set_guild_timezone(self, guild_id: int | None, timezone: str):
+        """Run a guild's schedules on another timezone's wall clock"""
+        try:
+            guild_timezone = pytz.timezone(timezone)
+        except pytz.UnknownTimeZoneError:
+            logger.warning(f"Unknown timezone '{timezone}'", extra={'guild_id': guild_id})
+            return False
+        
+        self.guild_timezones[guild_id] = guild_timezone
+        self._save(guild_id, GUILD_WIDE, timezone=guild_timezone.zone)
+        for task_name in self.registry.for_guild(guild_id):
+            self._update_guild(self.tasks.get(task_name), guild_id)
+        
+        logger.info(f"Set timezone to {guild_timezone.zone}", extra={'guild_id': guild_id})
+        return True
+    
+    def get_task(self, name: str, guild_id: int | None = None) -> dict[str, Any] | None:
+        """A task as seen from one guild, or None if it does not exist"""
+        task = self.tasks.get(name)
+        if task is None:
+            return None
+        
+        entry = self.registry.get(guild_id, name)
+        schedule = self._guild_schedule(task, guild_id)
+        slot = task.slots.get(slot_key(schedule))
+        return {
+            'name': name,
+            'time': schedule.describe(),
+            'timezone': schedule.timezone.zone,
+            'enabled': task.enabled and (entry is None or entry.enabled),
+            'running': task.next_run is not None,
+            'next_run': slot.next_run if slot else task.next_run,
+            'channel_id': entry.channel_id if entry else None,
+            'channel_count': len(self.registry.for_task(name))
+        }
+    
+    def list_tasks(self, guild_id: int | None = None) -> list[dict[str, Any]]:
+        """Get list of all scheduled tasks as seen from the given guild"""
+        return [self.get_task(name, guild_id) for name in self.tasks]
+    
+    def update_task_time(self, name: str, hour: int, minute: int, guild_id: int | None = None):
+        """Update the time for a specific task, or only for a guild's copy of it"""
         if name not in self.tasks:
-            print(f"Task '{name}' not found")
+            logger.warning(f"Task '{name}' not found")
             return False
         
         task = self.tasks[name]
-        was_running = task.task.is_running() if task.task else False
+        if guild_id is None:
+            task.schedule = DailySchedule(hour, minute, task.schedule.timezone)
+            # Guilds without their own time move with the task
+            self._rebuild_members(task)
+            # Reschedule in place: O(log n) per slot, no teardown of the engine
+            if task.next_run is not None:
+                self._unschedule_task(task)
+                self._schedule_task(task)
+        else:
+            self.registry.ensure(guild_id, name).schedule = DailySchedule(hour, minute)
+            self._update_guild(task, guild_id)
+        self._save(guild_id, name, hour=hour, minute=minute)
         
-        # Stop current task
-        if was_running:
-            task.stop()
+        logger.info(f"Updated task '{name}' time to {hour:02d}:{minute:02d}", extra={'task': name, 'guild_id': guild_id})
+        return True
+    
+    def load_settings(self):
+        """Restore saved channels, timezones and task overrides (call after adding tasks)"""
+        if not self.store:
+            return
         
-        # Update time
-        task.hour = hour
-        task.minute = minute
+        for row in self.store.load():
+            guild_id, task_name = row['guild_id'], row['task_name']
+            if row['timezone']:
+                try:
+                    self.guild_timezones[guild_id] = pytz.timezone(row['timezone'])
+                except pytz.UnknownTimeZoneError:
+                    logger.warning(f"Ignoring unknown saved timezone '{row['timezone']}'", extra={'guild_id': guild_id})
+            if task_name == GUILD_WIDE:
+                continue
+            
+            task = self.tasks.get(task_name)
+            if guild_id is None and task is not None:
+                # Task-wide overrides only apply to tasks that are still configured
+                if row['hour'] is not None:
+                    task.schedule = DailySchedule(row['hour'], row['minute'] or 0, task.schedule.timezone)
+                if row['enabled'] is not None:
+                    task.enabled = bool(row['enabled'])
+                if row['channel_id'] is not None:
+                    self.registry.ensure(guild_id, task_name).channel_id = row['channel_id']
+            elif guild_id is not None:
+                entry = self.registry.ensure(guild_id, task_name)
+                entry.channel_id = row['channel_id']
+                if row['hour'] is not None:
+                    entry.schedule = DailySchedule(row['hour'], row['minute'] or 0)
+                if row['enabled'] is not None:
+                    entry.enabled = bool(row['enabled'])
         
-        # Recreate the task with new time
-        func = task.func
-        self.remove_task(name)
-        new_task = self.add_task(name, func, hour, minute, task.enabled)
+        # Re-slot every task for the restored guilds
+        for task in self.tasks.values():
+            self._rebuild_members(task)
+            if task.next_run is not None:
+                self._unschedule_task(task)
+                self._schedule_task(task)
+    
+    def _save(self, guild_id: int | None, task_name: str, **values):
+        """Write a settings change through to the store"""
+        if self.store:
+            self.store.save(guild_id, task_name, **values)
+    
+    def _guild_schedule(self, task: ScheduledTask, guild_id: int | None):
+        """Schedule a guild's copy of the task runs on, in the guild's timezone"""
+        entry = self.registry.get(guild_id, task.name)
+        schedule = entry.schedule if entry and entry.schedule else task.schedule
+        return schedule.with_timezone(self.guild_timezones.get(guild_id, task.schedule.timezone))
+    
+    def _guild_key(self, task: ScheduledTask, entry: GuildTask) -> str | None:
+        """Slot key a guild copy belongs under, or None while it is not subscribed"""
+        if not (entry.enabled and entry.channel_id):
+            return None
+        timezone = self.guild_timezones.get(entry.guild_id, task.schedule.timezone)
+        return slot_key(entry.schedule or task.schedule, timezone)
+    
+    def _move_member(self, task: ScheduledTask, entry: GuildTask) -> set[str]:
+        """File a guild copy under its current slot key, returning the keys whose members changed"""
+        key = self._guild_key(task, entry)
+        old_key = entry.slot_key
+        if key == old_key:
+            return set()
         
-        # Start if it was running before
-        if was_running:
-            new_task.start()
+        if old_key is not None:
+            members = task.members.get(old_key, {})
+            members.pop(entry.guild_id, None)
+            if not members:
+                task.members.pop(old_key, None)
+        if key is not None:
+            task.members.setdefault(key, {})[entry.guild_id] = entry
+        entry.slot_key = key
+        return {old_key, key} - {None}
+    
+    def _rebuild_members(self, task: ScheduledTask):
+        """Re-file every guild copy of the task after a task-wide change"""
+        task.members = {}
+        for entry in self.registry.for_task(task.name).values():
+            entry.slot_key = None
+            self._move_member(task, entry)
+    
+    def _update_guild(self, task: ScheduledTask | None, guild_id: int | None):
+        """Re-slot one guild's copy after its channel, time, timezone or enabled flag changed"""
+        entry = self.registry.get(guild_id, task.name) if task else None
+        if entry is None:
+            return
+        changed = self._move_member(task, entry)
+        if changed and task.next_run is not None:
+            self._refresh_slots(task, changed)
+    
+    def _slot_schedule(self, task: ScheduledTask, key: str):
+        """Schedule of a slot key in use (built from one of its guilds), or None if no slot is needed"""
+        members = task.members.get(key)
+        if members:
+            entry = next(iter(members.values()))
+            return self._guild_schedule(task, entry.guild_id)
+        if not task.members and key == slot_key(task.schedule):
+            return task.schedule  # nobody subscribed: the task default still runs
+        return None
+    
+    def _slot_schedules(self, task: ScheduledTask) -> dict[str, Any]:
+        """Distinct schedules of the task's subscribed guilds (the task default if none)"""
+        return {key: self._slot_schedule(task, key) for key in task.members or [slot_key(task.schedule)]}
+    
+    def _refresh_slots(self, task: ScheduledTask, keys: set[str]):
+        """Add or drop the slots of the given keys (and the default one): O(log n) per changed slot"""
+        for key in keys | {slot_key(task.schedule)}:
+            schedule = self._slot_schedule(task, key)
+            if schedule is None and key in task.slots:
+                self._unschedule(task.slots.pop(key))
+            elif schedule is not None and key not in task.slots:
+                task.slots[key] = ScheduleSlot(task, schedule)
+                self._schedule(task.slots[key])
+    
+    def _schedule_task(self, task: ScheduledTask):
+        """Schedule one slot per distinct schedule in use"""
+        task.slots = {key: ScheduleSlot(task, schedule) for key, schedule in self._slot_schedules(task).items()}
+        for slot in task.slots.values():
+            self._schedule(slot)
+    
+    def _unschedule_task(self, task: ScheduledTask):
+        """Invalidate every slot of the task"""
+        for slot in task.slots.values():
+            self._unschedule(slot)
+        task.slots = {}
+    
+    def _now(self) -> datetime:
+        """Current instant in UTC; schedules convert from their own timezone"""
+        return datetime.now(pytz.UTC)
+    
+    def _schedule(self, slot: ScheduleSlot, after: datetime | None = None):
+        """Push the slot's next fire time onto the heap"""
+        now = self._now()
+        next_run = slot.schedule.next_after(after or now)
+        if next_run <= now:
+            # Fell behind (e.g. the event loop was blocked): skip missed runs
+            next_run = slot.schedule.next_after(now)
+        
+        self._unschedule(slot)
+        slot.next_run = next_run
         
-        print(f"Updated task '{name}' time to {hour:02d}:{minute:02d}")
-        return True
\ No newline at end of file
+        # Rebuild when stale entries outnumber live ones
+        if self._stale > len(self._heap) // 2 + 32:
+            self._heap = [entry for entry in self._heap if entry[2] == entry[3].generation]
+            heapq.heapify(self._heap)
+            self._stale = 0
+        self._push(slot, next_run, False)
+        if slot.task.prepare:
+            # Warm up a lead time ahead, or right away if the fire is closer than that
+            self._push(slot, max(next_run - self.prefetch_lead, now), True)
+    
+    def _push(self, slot: ScheduleSlot, run_time: datetime, is_prepare: bool):
+        """Add a heap entry for the slot, waking the engine if it is now the earliest"""
+        heapq.heappush(self._heap, (run_time, next(self._sequence), slot.generation, slot, is_prepare))
+        slot.entries += 1
+        if self._wakeup and self._heap[0][3] is slot:
+            self._wakeup.set()
+    
+    def _unschedule(self, slot: ScheduleSlot):
+        """Invalidate the slot's heap entries (removed lazily when they reach the top)"""
+        self._stale += slot.entries
+        slot.entries = 0
+        slot.generation += 1
+        slot.next_run = None
+    
+    async def _run(self):
+        """Engine loop: sleep until the earliest fire time, then run every due task"""
+        await self.bot.wait_until_ready()
+        
+        # Also stop once replaced: wait_for can swallow a cancel that races with the wake-up
+        while self._engine is asyncio.current_task():
+            # Drop stale entries left behind by removals and reschedules
+            while self._heap and self._heap[0][2] != self._heap[0][3].generation:
+                heapq.heappop(self._heap)
+                self._stale -= 1
+            
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            
+            delay = (self._heap[0][0] - self._now()).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), min(delay, MAX_SLEEP_SECONDS))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            # One wake-up handles every slot due at this UTC instant
+            batches: dict[Callable, list[ScheduleSlot]] = {}
+            preparations: dict[Callable, list[ScheduleSlot]] = {}
+            now = self._now()
+            while self._heap and self._heap[0][0] <= now:
+                run_time, _, generation, slot, is_prepare = heapq.heappop(self._heap)
+                if generation != slot.generation:
+                    self._stale -= 1
+                    continue
+                slot.entries -= 1
+                FIRE_DELAY.observe((now - run_time).total_seconds(), phase='prepare' if is_prepare else 'fire')
+                if is_prepare:
+                    preparations.setdefault(slot.task.prepare, []).append(slot)
+                    continue
+                
+                # The fire entry is gone; drop a prepare entry that never ran and reschedule
+                self._unschedule(slot)
+                self._schedule(slot, after=run_time)
+                batches.setdefault(slot.task.func, []).append(slot)
+            
+            # Slots sharing a function run once over all their channels (one calendar fetch)
+            for func, due_slots in preparations.items():
+                self._start_job(self._execute(func, due_slots))
+            for func, due_slots in batches.items():
+                self._start_job(self._execute(func, due_slots))
+            HEAP_ENTRIES.set(len(self._heap))
+    
+    def _start_job(self, coroutine):
+        """Run a task function in the background, tracked until it finishes"""
+        job = asyncio.create_task(coroutine)
+        self._jobs.add(job)
+        job.add_done_callback(self._jobs.discard)
+    
+    async def _execute(self, func: Callable, slots: list[ScheduleSlot]):
+        """Run a task function once against the channels of every due slot, grouped by timezone"""
+        names = ', '.join(sorted({slot.task.name for slot in slots}))
+        started = perf_counter()
+        try:
+            # Every subscribed channel, one per guild, under the timezone of its slot
+            channel_ids = {}
+            for slot in slots:
+                members = slot.task.members.get(slot.key, {})
+                channel_ids.setdefault(slot.schedule.timezone, set()).update(entry.channel_id for entry in members.values())
+            channels = {
+                timezone: [channel for channel in map(self.bot.get_channel, ids) if channel]
+                for timezone, ids in channel_ids.items()
+            }
+            await func(channels)
+        except Exception as e:
+            TASK_ERRORS.inc(task=names)
+            logger.exception(f"Error in scheduled task '{names}': {e}", extra={'task': names})
+        finally:
+            TASK_LATENCY.observe(perf_counter() - started, task=names)
@@ -0,0 +1,56 @@
+"""
+Single-flight module
+Coalesces concurrent identical calls so they share one upstream request
+"""
+
+import asyncio
+from utils.metrics import registry
+
+UPSTREAM_CALLS = registry.counter('singleflight_calls_total', 'Calls that went upstream, by group')
+SHARED_CALLS = registry.counter(
+    'singleflight_shared_total',
+    'Callers that awaited a call already in flight instead of making their own (upstream calls saved)'
+)
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers await its result
+    
+    The shared call runs as its own task, so a caller that is cancelled or
+    times out does not cancel it for the others. Results are not cached:
+    once the call finishes, the next caller starts a new one.
+    """
+    
+    def __init__(self, group: str):
+        self.group = group
+        self._calls: dict = {}
+    
+    def in_flight(self, key) -> bool:
+        """Whether a call for the key is currently running"""
+        return key in self._calls
+    
+    async def do(self, key, factory):
+        """
+        Await factory() for the key, or the call already in flight for it
+        
+        Returns (result, shared) where shared tells whether the result came
+        from another caller's request. Errors are shared the same way.
+        """
+        call = self._calls.get(key)
+        shared = call is not None
+        if shared:
+            SHARED_CALLS.inc(group=self.group)
+        else:
+            call = asyncio.ensure_future(factory())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._finish(key, done))
+            UPSTREAM_CALLS.inc(group=self.group)
+        
+        return await asyncio.shield(call), shared
+    
+    def _finish(self, key, call):
+        """Forget a finished call, marking its error retrieved if every caller gave up"""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            call.exception()
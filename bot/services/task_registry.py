@@ -0,0 +1,59 @@
+"""
+Task registry module
+Per-guild scheduled task settings indexed by (guild, task)
+"""
+
+class GuildTask:
+    """One guild's copy of a scheduled task"""
+    
+    def __init__(self, guild_id: int | None, task_name: str):
+        self.guild_id = guild_id
+        self.task_name = task_name
+        self.channel_id: int | None = None
+        self.enabled = True
+        self.schedule = None  # overrides the task's default schedule for this guild
+        self.slot_key: str | None = None  # slot this copy fires in, None while not subscribed
+
+class TaskRegistry:
+    """
+    Guild task entries keyed by (guild, task)
+    
+    Entries are also indexed by guild and by task, so a lookup, a guild's
+    listing or a task's subscribers never scan other guilds' entries.
+    """
+    
+    def __init__(self):
+        self._entries: dict[tuple[int | None, str], GuildTask] = {}
+        self._by_guild: dict[int | None, dict[str, GuildTask]] = {}
+        self._by_task: dict[str, dict[int | None, GuildTask]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, guild_id: int | None, task_name: str) -> GuildTask | None:
+        """Entry for a guild's task, if it has one"""
+        return self._entries.get((guild_id, task_name))
+    
+    def ensure(self, guild_id: int | None, task_name: str) -> GuildTask:
+        """Entry for a guild's task, created on first use"""
+        entry = self._entries.get((guild_id, task_name))
+        if entry is None:
+            entry = GuildTask(guild_id, task_name)
+            self._entries[(guild_id, task_name)] = entry
+            self._by_guild.setdefault(guild_id, {})[task_name] = entry
+            self._by_task.setdefault(task_name, {})[guild_id] = entry
+        return entry
+    
+    def remove(self, guild_id: int | None, task_name: str):
+        """Forget a guild's task entry"""
+        if self._entries.pop((guild_id, task_name), None) is not None:
+            del self._by_guild[guild_id][task_name]
+            del self._by_task[task_name][guild_id]
+    
+    def for_guild(self, guild_id: int | None) -> dict[str, GuildTask]:
+        """A guild's entries by task name"""
+        return self._by_guild.get(guild_id, {})
+    
+    def for_task(self, task_name: str) -> dict[int | None, GuildTask]:
+        """A task's entries by guild id"""
+        return self._by_task.get(task_name, {})
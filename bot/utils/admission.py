@@ -0,0 +1,129 @@
+"""
+Admission control utilities
+Per-user, per-channel and per-guild rate limits plus a global concurrency cap
+for commands that hit the calendar backend
+"""
+
+import asyncio
+import os
+from time import perf_counter
+from discord.ext import commands
+from .metrics import registry
+
+ADMISSIONS = registry.counter('admission_requests_total', 'Admission decisions for calendar commands, by result')
+QUEUE_WAIT = registry.histogram('admission_queue_wait_seconds', 'Time commands waited for a free calendar slot')
+IN_FLIGHT = registry.gauge('admission_in_flight', 'Calendar commands currently running')
+QUEUED = registry.gauge('admission_queued', 'Calendar commands waiting for a free slot')
+
+BUCKET_SCOPES = (
+    ('user', commands.BucketType.user),
+    ('channel', commands.BucketType.channel),
+    ('guild', commands.BucketType.guild),
+)
+
+def parse_limit(value: str | None) -> tuple[int, float] | None:
+    """'5/30' -> 5 commands per 30 seconds; empty or 0 disables the limit"""
+    if not value or not value.strip() or value.strip() == '0':
+        return None
+    rate, _, per = value.partition('/')
+    return int(rate), float(per or 60)
+
+class AdmissionRejected(Exception):
+    """Raised when the calendar backend is at capacity and the command cannot wait"""
+
+class AdmissionController:
+    """
+    Decides whether a calendar command may run now, later or not at all
+    
+    Each scope keeps a discord.py cooldown mapping, so buckets are keyed
+    and expired the same way as @commands.cooldown; a command must fit in
+    all of them. Admitted commands then share max_concurrent slots: with
+    the 'queue' policy up to max_queue commands wait up to queue_timeout
+    seconds for one, with 'reject' they are turned away immediately.
+    """
+    
+    def __init__(self, limits: dict[str, tuple[int, float] | None] | None = None, max_concurrent: int = 8,
+                 policy: str = 'queue', max_queue: int = 32, queue_timeout: float = 10.0):
+        if policy not in ('queue', 'reject'):
+            raise ValueError(f"Unknown admission policy: {policy!r}")
+        
+        self.cooldowns = {
+            scope: commands.CooldownMapping.from_cooldown(*limits[scope], bucket_type)
+            for scope, bucket_type in BUCKET_SCOPES
+            if limits and limits.get(scope)
+        }
+        self.max_concurrent = max_concurrent
+        self.policy = policy
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(max_concurrent)
+    
+    @classmethod
+    def from_env(cls) -> 'AdmissionController':
+        """Build the controller from ADMISSION_* settings"""
+        return cls(
+            limits={
+                'user': parse_limit(os.getenv('ADMISSION_USER_LIMIT', '5/30')),
+                'channel': parse_limit(os.getenv('ADMISSION_CHANNEL_LIMIT', '10/30')),
+                'guild': parse_limit(os.getenv('ADMISSION_GUILD_LIMIT', '30/60')),
+            },
+            max_concurrent=int(os.getenv('ADMISSION_MAX_CONCURRENT', '8')),
+            policy=os.getenv('ADMISSION_POLICY', 'queue').lower(),
+            max_queue=int(os.getenv('ADMISSION_QUEUE_SIZE', '32')),
+            queue_timeout=float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '10'))
+        )
+    
+    def check_rate(self, ctx):
+        """Take a token from every bucket of the invoker, or raise CommandOnCooldown"""
+        buckets = [(scope, mapping, mapping.get_bucket(ctx.message)) for scope, mapping in self.cooldowns.items()]
+        
+        # Check all buckets before consuming any, so a rejection costs nothing
+        for scope, mapping, bucket in buckets:
+            if bucket is not None and bucket.get_tokens() == 0:
+                ADMISSIONS.inc(result='rate_limited', scope=scope)
+                raise commands.CommandOnCooldown(bucket, bucket.get_retry_after(), mapping.type)
+        
+        for _, _, bucket in buckets:
+            if bucket is not None:
+                bucket.update_rate_limit()
+    
+    async def acquire(self):
+        """Wait for a concurrency slot according to the policy, or raise AdmissionRejected"""
+        if not self._slots.locked():
+            await self._slots.acquire()
+            ADMISSIONS.inc(result='admitted')
+        else:
+            if self.policy == 'reject' or self.waiting >= self.max_queue:
+                ADMISSIONS.inc(result='rejected')
+                raise AdmissionRejected("⏳ The calendar is busy right now. Please try again in a moment.")
+            
+            self.waiting += 1
+            QUEUED.set(self.waiting)
+            started = perf_counter()
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                ADMISSIONS.inc(result='timed_out')
+                raise AdmissionRejected("⏳ The calendar is still busy. Please try again in a moment.") from None
+            finally:
+                self.waiting -= 1
+                QUEUED.set(self.waiting)
+                QUEUE_WAIT.observe(perf_counter() - started)
+            ADMISSIONS.inc(result='queued')
+        
+        IN_FLIGHT.inc()
+    
+    def release(self):
+        """Free the slot taken by acquire"""
+        IN_FLIGHT.dec()
+        self._slots.release()
+
+_controller: AdmissionController | None = None
+
+def get_admission_controller() -> AdmissionController:
+    """Process-wide admission controller, built on first use (after .env is loaded)"""
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController.from_env()
+    return _controller
@@ -0,0 +1,126 @@
+"""
+Authorization utilities
+Who may run protected commands: users and roles, globally or per guild
+"""
+
+import json
+import logging
+import os
+from time import monotonic
+
+logger = logging.getLogger(__name__)
+
+def parse_ids(value) -> frozenset[int]:
+    """Discord ids from a comma-separated string or a list, ignoring anything non-numeric"""
+    if isinstance(value, str):
+        value = value.split(',')
+    return frozenset(int(str(item).strip()) for item in value or () if str(item).strip().isdigit())
+
+class AuthorizationIndex:
+    """
+    Immutable lookup tables built once from configuration
+    
+    Global users and roles apply everywhere; a guild override adds its own
+    users and roles, and with "inherit": false replaces the global ones
+    inside that guild.
+    """
+    
+    __slots__ = ('users', 'roles', 'guilds')
+    
+    def __init__(self, users: frozenset[int] = frozenset(), roles: frozenset[int] = frozenset(),
+                 guilds: dict[int, tuple[frozenset[int], frozenset[int]]] | None = None):
+        self.users = users
+        self.roles = roles
+        self.guilds = guilds or {}  # guild_id -> (users, roles) effective inside the guild
+    
+    @classmethod
+    def from_config(cls, users, roles, guild_overrides: dict | None = None) -> 'AuthorizationIndex':
+        """Build the index, folding inherited global entries into each guild override"""
+        users, roles = parse_ids(users), parse_ids(roles)
+        guilds = {}
+        for guild_id, override in (guild_overrides or {}).items():
+            guild_users, guild_roles = parse_ids(override.get('users')), parse_ids(override.get('roles'))
+            if override.get('inherit', True):
+                guild_users, guild_roles = guild_users | users, guild_roles | roles
+            guilds[int(guild_id)] = (guild_users, guild_roles)
+        return cls(users, roles, guilds)
+    
+    def allows(self, user_id: int, role_ids=(), guild_id: int | None = None) -> bool:
+        """Whether a user (with the given role ids, in the given guild) is authorized"""
+        users, roles = self.guilds.get(guild_id, (self.users, self.roles))
+        if user_id in users:
+            return True
+        return bool(roles) and any(role_id in roles for role_id in role_ids)
+
+class Authorizer:
+    """
+    Holds the current AuthorizationIndex and swaps it when configuration changes
+    
+    Configuration comes from AUTHORIZED_USERS and AUTHORIZED_ROLES, plus an
+    optional AUTHORIZATION_FILE (JSON with "users", "roles" and "guilds")
+    that is re-read when its modification time changes. The file is
+    checked at most once per reload interval, so a check stays O(1).
+    """
+    
+    def __init__(self, path: str | None = None, reload_interval: float | None = None):
+        self.path = path if path is not None else os.getenv('AUTHORIZATION_FILE', '')
+        self.reload_interval = reload_interval if reload_interval is not None else float(
+            os.getenv('AUTHORIZATION_RELOAD_INTERVAL', '5')
+        )
+        self.index: AuthorizationIndex | None = None
+        self._mtime = None
+        self._next_check = 0.0
+        self.reload()
+    
+    def reload(self) -> AuthorizationIndex:
+        """Rebuild the index from the environment and the authorization file"""
+        users = os.getenv('AUTHORIZED_USERS', '')
+        roles = os.getenv('AUTHORIZED_ROLES', '')
+        guilds = {}
+        
+        if self.path:
+            try:
+                self._mtime = os.stat(self.path).st_mtime
+                with open(self.path, encoding='utf-8') as file:
+                    config = json.load(file)
+                users = parse_ids(users) | parse_ids(config.get('users'))
+                roles = parse_ids(roles) | parse_ids(config.get('roles'))
+                guilds = config.get('guilds', {})
+            except (OSError, ValueError, AttributeError) as e:
+                # Keep serving the previous index rather than locking everyone out;
+                # with none yet, the environment settings still apply
+                logger.error(f"Error loading authorization file {self.path}: {e}", extra={'path': self.path})
+                if self.index is not None:
+                    return self.index
+        
+        self.index = AuthorizationIndex.from_config(users, roles, guilds)
+        self._next_check = monotonic() + self.reload_interval
+        logger.info(f"Authorization loaded: {len(self.index.users)} users, {len(self.index.roles)} roles, "
+                    f"{len(self.index.guilds)} guild overrides", extra={'path': self.path})
+        return self.index
+    
+    def current(self) -> AuthorizationIndex:
+        """The index to check against, reloading first if the file changed"""
+        if self.path and monotonic() >= self._next_check:
+            self._next_check = monotonic() + self.reload_interval
+            try:
+                changed = os.stat(self.path).st_mtime != self._mtime
+            except OSError:
+                changed = False
+            if changed:
+                self.reload()
+        return self.index
+    
+    def is_authorized(self, member, guild_id: int | None = None) -> bool:
+        """Check a discord User or Member"""
+        role_ids = (role.id for role in getattr(member, 'roles', ()))
+        return self.current().allows(member.id, role_ids, guild_id)
+
+_authorizer: Authorizer | None = None
+
+def get_authorizer() -> Authorizer:
+    """Process-wide authorizer, built on first use (after .env is loaded)"""
+    global _authorizer
+    if _authorizer is None:
+        _authorizer = Authorizer()
+    return _authorizer
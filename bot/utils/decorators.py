@@ -2,33 +2,57 @@
 Custom decorators for bot commands
 """
 
-import os
 from functools import wraps
 from discord.ext import commands
+from .admission import AdmissionRejected, get_admission_controller
+from .authorization import get_authorizer
+
+class NotAuthorized(commands.CheckFailure):
+    """Raised when a user may not run a protected command"""
 
 def authorized_only():
     """
     Decorator to restrict command access to authorized users only.
-    Authorized users are defined in AUTHORIZED_USERS environment variable.
+    Authorized users and roles are defined in AUTHORIZED_USERS, AUTHORIZED_ROLES
+    and the optional AUTHORIZATION_FILE (see utils.authorization).
+    """
+    async def predicate(ctx):
+        # The index is built once and only rebuilt when configuration changes
+        authorizer = getattr(ctx.bot, 'authorizer', None) or get_authorizer()
+        if not authorizer.is_authorized(ctx.author, ctx.guild.id if ctx.guild else None):
+            raise NotAuthorized("❌ You are not authorized to use this command")
+        return True
+    
+    return commands.check(predicate)
+
+def admission_controlled():
+    """
+    Decorator for commands backed by the calendar API.
+    Rate limits per user, channel and guild raise CommandOnCooldown; the
+    global concurrency cap queues or turns the command away (see utils.admission).
     """
     def decorator(func):
         @wraps(func)
         async def wrapper(self, ctx, *args, **kwargs):
-            # Load authorized users from environment
-            authorized_users_str = os.getenv('AUTHORIZED_USERS', '')
-            authorized_users = set()
-            if authorized_users_str:
-                authorized_users = set(int(uid.strip()) for uid in authorized_users_str.split(',') if uid.strip().isdigit())
-            
-            # Check if user is authorized
-            if ctx.author.id not in authorized_users:
-                await ctx.send("❌ You are not authorized to use this command")
+            controller = getattr(ctx.bot, 'admission', None) or get_admission_controller()
+            try:
+                await controller.acquire()
+            except AdmissionRejected as e:
+                await ctx.send(str(e))
                 return
             
-            # Execute the original function
-            return await func(self, ctx, *args, **kwargs)
+            try:
+                return await func(self, ctx, *args, **kwargs)
+            finally:
+                controller.release()
         
-        return wrapper
+        async def predicate(ctx):
+            controller = getattr(ctx.bot, 'admission', None) or get_admission_controller()
+            controller.check_rate(ctx)
+            return True
+        
+        # Rate limits run as a check, so CommandOnCooldown reaches on_command_error
+        return commands.check(predicate)(wrapper)
     return decorator
 
 def require_bot_attribute(attribute_name: str, error_message: str = None):
@@ -0,0 +1,223 @@
+"""
+Metrics utilities
+In-process counters, gauges and latency histograms with a Prometheus text endpoint
+"""
+
+import asyncio
+import logging
+import os
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, from fast cache hits to slow API calls and fan-outs
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _label_key(labels: dict) -> tuple:
+    """Hashable, order-independent key for a label set"""
+    return tuple(sorted(labels.items()))
+
+def _escape(value) -> str:
+    """Escape a label value for the text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(key: tuple) -> str:
+    """Render a label key as {name="value",...}"""
+    if not key:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in key) + '}'
+
+class Counter:
+    """Monotonically increasing count per label set"""
+    
+    kind = 'counter'
+    
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.values: dict[tuple, float] = {}
+    
+    def inc(self, amount: float = 1, **labels):
+        """Add to the value for a label set"""
+        key = _label_key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+    
+    def total(self) -> float:
+        """Sum over all label sets"""
+        return sum(self.values.values())
+    
+    def samples(self):
+        """(sample name, label key, value) for the text format"""
+        for key, value in self.values.items():
+            yield self.name, key, value
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+    
+    kind = 'gauge'
+    
+    def set(self, value: float, **labels):
+        """Replace the value for a label set"""
+        self.values[_label_key(labels)] = value
+    
+    def dec(self, amount: float = 1, **labels):
+        """Subtract from the value for a label set"""
+        self.inc(-amount, **labels)
+
+class Histogram:
+    """Bucketed distribution of observed values (latencies in seconds)"""
+    
+    kind = 'histogram'
+    
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.series: dict[tuple, list] = {}  # label key -> [bucket counts..., +Inf count, sum]
+    
+    def observe(self, value: float, **labels):
+        """Record one value"""
+        key = _label_key(labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+    
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a with block"""
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - started, **labels)
+    
+    def count(self, **labels) -> int:
+        """Observations, for one label set or all of them"""
+        return sum(sum(series[:-1]) for series in self._matching(labels))
+    
+    def quantile(self, q: float, **labels) -> float | None:
+        """Estimate a quantile (upper bound of the bucket it falls in) over matching series"""
+        counts = [0] * (len(self.buckets) + 1)
+        for series in self._matching(labels):
+            for index, value in enumerate(series[:-1]):
+                counts[index] += value
+        total = sum(counts)
+        if not total:
+            return None
+        
+        rank = q * total
+        seen = 0
+        for index, value in enumerate(counts):
+            seen += value
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float('inf')
+        return float('inf')
+    
+    def _matching(self, labels: dict):
+        """Series whose labels include all of the given ones"""
+        if not labels:
+            return self.series.values()
+        wanted = set(labels.items())
+        return [series for key, series in self.series.items() if wanted <= set(key)]
+    
+    def samples(self):
+        """Cumulative bucket, sum and count samples for the text format"""
+        for key, series in self.series.items():
+            cumulative = 0
+            for bound, value in zip(self.buckets, series):
+                cumulative += value
+                yield f"{self.name}_bucket", key + (('le', f"{bound:g}"),), cumulative
+            cumulative += series[len(self.buckets)]
+            yield f"{self.name}_bucket", key + (('le', '+Inf'),), cumulative
+            yield f"{self.name}_sum", key, series[-1]
+            yield f"{self.name}_count", key, cumulative
+
+class MetricsRegistry:
+    """Named metrics, created on first use and rendered in Prometheus text format"""
+    
+    def __init__(self):
+        self.metrics: dict[str, Counter | Gauge | Histogram] = {}
+    
+    def counter(self, name: str, help_text: str = '') -> Counter:
+        """Get or create a counter"""
+        return self._get(Counter, name, help_text)
+    
+    def gauge(self, name: str, help_text: str = '') -> Gauge:
+        """Get or create a gauge"""
+        return self._get(Gauge, name, help_text)
+    
+    def histogram(self, name: str, help_text: str = '', buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram"""
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = Histogram(name, help_text, buckets)
+        elif not isinstance(metric, Histogram):
+            raise ValueError(f"Metric '{name}' is already registered as a {metric.kind}")
+        return metric
+    
+    def _get(self, cls, name: str, help_text: str):
+        """Get or create a counter or gauge, refusing to mix the two under one name"""
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, help_text)
+        elif type(metric) is not cls:
+            raise ValueError(f"Metric '{name}' is already registered as a {metric.kind}")
+        return metric
+    
+    def render(self) -> str:
+        """Prometheus text exposition of every metric"""
+        lines = []
+        for name in sorted(self.metrics):
+            metric = self.metrics[name]
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for sample_name, key, value in metric.samples():
+                lines.append(f"{sample_name}{_format_labels(key)} {value:g}")
+        return '\n'.join(lines) + '\n'
+
+# Process-wide registry shared by every instrumented module
+registry = MetricsRegistry()
+
+async def start_metrics_server(host: str | None = None, port: int | None = None) -> asyncio.AbstractServer | None:
+    """
+    Serve GET /metrics on a local port (METRICS_HOST, METRICS_PORT)
+    
+    Disabled when the port is 0 or unset. Binds to localhost by default so
+    the endpoint is only reachable by a local Prometheus agent.
+    """
+    host = host or os.getenv('METRICS_HOST', '127.0.0.1')
+    port = port if port is not None else int(os.getenv('METRICS_PORT', '0') or 0)
+    if not port:
+        return None
+    
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+            # Drain headers; the request body is never needed
+            while (await asyncio.wait_for(reader.readline(), 5)).strip():
+                pass
+            
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+                status, body = '200 OK', registry.render().encode()
+            else:
+                status, body = '404 Not Found', b'Not Found\n'
+            
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+    
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,51 @@
+"""
+Startup timing utilities
+Records a per-phase breakdown of bot startup and checks it against a budget
+"""
+
+import os
+from time import perf_counter
+
+class StartupTimer:
+    """Collects named startup phases measured from a common start point"""
+    
+    def __init__(self, budget_ms: float | None = None):
+        self.started = perf_counter()
+        self.last_mark = self.started
+        self.phases: list[tuple[str, float]] = []  # (phase, duration_ms)
+        self.reported = False
+        self.budget_ms = budget_ms
+    
+    def mark(self, phase: str) -> float:
+        """Close the current phase and return its duration in milliseconds"""
+        now = perf_counter()
+        duration_ms = (now - self.last_mark) * 1000
+        self.phases.append((phase, duration_ms))
+        self.last_mark = now
+        return duration_ms
+    
+    @property
+    def total_ms(self) -> float:
+        """Time from start to the last recorded phase"""
+        return (self.last_mark - self.started) * 1000
+    
+    def report(self) -> str:
+        """Format the phase breakdown, flagging a blown budget"""
+        lines = ['⏱️ Startup timing:']
+        for phase, duration_ms in self.phases:
+            lines.append(f'  {phase:<12} {duration_ms:8.1f} ms')
+        lines.append(f'  {"total":<12} {self.total_ms:8.1f} ms')
+        
+        # Read lazily: the timer starts before .env is loaded
+        budget_ms = self.budget_ms
+        if budget_ms is None and os.getenv('STARTUP_BUDGET_MS'):
+            budget_ms = float(os.getenv('STARTUP_BUDGET_MS'))
+        
+        if budget_ms is not None:
+            if self.total_ms > budget_ms:
+                lines.append(f'⚠️ Startup exceeded budget of {budget_ms:.0f} ms')
+            else:
+                lines.append(f'✅ Startup within budget of {budget_ms:.0f} ms')
+        
+        self.reported = True
+        return '\n'.join(lines)
@@ -0,0 +1,915 @@
+"""
+Tests for the scheduler, calendar sync and rendering, and the command guards
+Run from the repository root with: python -m pytest -q
+"""
+
+import ast
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import date, datetime, timedelta
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytz
+from discord.ext import commands
+
+# The bot runs from bot/ with absolute imports (services.x, utils.x)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bot'))
+
+from services.calendar_client import CalendarApiClient, CalendarApiError, parse_retry_after
+from services.calendar_event import CalendarEvent
+from services.calendar_service import GoogleCalendarService
+from services.calendar_tasks import DEGRADED_NOTICE, CalendarTasks
+from services.cron import CronSchedule, DailySchedule
+from services.event_index import DayIndex
+from services.quota import CircuitBreaker, CircuitOpenError, QuotaManager, is_retryable
+from services.render_cache import RenderCache
+from services.schedule_renderer import (
+    DESCRIPTION_LIMIT, EMBED_TOTAL_LIMIT, EMBEDS_PER_MESSAGE, TITLE_LIMIT, ScheduleRenderer
+)
+from services.schedule_store import ScheduleStore
+from services.scheduler_service import SchedulerService
+from services.single_flight import SingleFlight
+from utils.admission import AdmissionController, AdmissionRejected, parse_limit
+from utils.authorization import Authorizer
+
+SEOUL = pytz.timezone('Asia/Seoul')
+NEW_YORK = pytz.timezone('America/New_York')
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=pytz.UTC)
+
+# CronSchedule.next_after
+
+def test_daily_next_after_same_day_and_next_day():
+    schedule = DailySchedule(8, 30, SEOUL)
+    # 07:00 KST -> 08:30 KST the same day
+    assert schedule.next_after(utc(2025, 3, 1, 22, 0)) == utc(2025, 3, 1, 23, 30)
+    # Exactly on the fire time -> strictly after, so tomorrow
+    assert schedule.next_after(utc(2025, 3, 1, 23, 30)) == utc(2025, 3, 2, 23, 30)
+
+def test_cron_fields():
+    # 09:15 on weekdays
+    schedule = CronSchedule('15 9 * * 1-5', pytz.UTC)
+    # Friday 2025-03-07 10:00 -> Monday 2025-03-10 09:15
+    assert schedule.next_after(utc(2025, 3, 7, 10, 0)) == utc(2025, 3, 10, 9, 15)
+    # Every 20 minutes
+    assert CronSchedule('*/20 * * * *').next_after(utc(2025, 3, 7, 10, 41)) == utc(2025, 3, 7, 11, 0)
+
+def test_cron_dst_spring_forward_shifts_past_the_gap():
+    # 2025-03-09: New York clocks jump from 02:00 to 03:00, so 02:30 does not exist
+    schedule = DailySchedule(2, 30, NEW_YORK)
+    fire = schedule.next_after(utc(2025, 3, 9, 5, 0))  # 00:00 EST
+    assert fire == utc(2025, 3, 9, 7, 30)  # 03:30 EDT
+    # The next day is back on 02:30 local time
+    assert schedule.next_after(fire) == utc(2025, 3, 10, 6, 30)
+
+def test_cron_dst_fall_back_fires_once():
+    # 2025-11-02: New York repeats 01:00-02:00; 01:30 must fire only once
+    schedule = DailySchedule(1, 30, NEW_YORK)
+    fire = schedule.next_after(utc(2025, 11, 2, 4, 0))  # 00:00 EDT
+    assert fire == utc(2025, 11, 2, 5, 30)  # first 01:30, still EDT
+    assert schedule.next_after(fire) == utc(2025, 11, 3, 6, 30)  # skips the repeated 01:30 EST
+
+def test_cron_keeps_local_time_across_dst():
+    schedule = DailySchedule(8, 0, NEW_YORK)
+    assert schedule.next_after(utc(2025, 3, 8, 12, 0)) == utc(2025, 3, 8, 13, 0)  # EST
+    assert schedule.next_after(utc(2025, 3, 9, 12, 0)) == utc(2025, 3, 10, 12, 0)  # EDT
+
+# SchedulerService
+
+class FakeBot:
+    """Never becomes ready, so the engine only idles while tests inspect the heap"""
+    
+    def __init__(self):
+        self.ready = asyncio.Event()
+    
+    async def wait_until_ready(self):
+        await self.ready.wait()
+    
+    def get_channel(self, channel_id):
+        return f'channel-{channel_id}'
+
+async def noop(channels):
+    return None
+
+def live_entries(scheduler: SchedulerService) -> list:
+    return [entry for entry in scheduler._heap if entry[2] == entry[3].generation]
+
+def test_scheduler_reschedule_moves_next_run():
+    async def run():
+        scheduler = SchedulerService(FakeBot())
+        scheduler.start_all()
+        task = scheduler.add_task('daily', noop, hour=8, minute=0, timezone='Asia/Seoul')
+        first = task.next_run
+        assert first.astimezone(SEOUL).hour == 8
+        
+        assert scheduler.update_task_time('daily', 21, 45)
+        assert task.next_run.astimezone(SEOUL).strftime('%H:%M') == '21:45'
+        assert task.next_run != first
+        # The old heap entry is stale, so exactly one live entry remains
+        assert len(live_entries(scheduler)) == 1
+        assert scheduler.update_task_time('missing', 1, 0) is False
+        scheduler.stop_all()
+    
+    asyncio.run(run())
+
+def test_scheduler_guild_reschedule_adds_its_own_slot():
+    async def run():
+        scheduler = SchedulerService(FakeBot())
+        scheduler.start_all()
+        task = scheduler.add_task('daily', noop, hour=8, timezone='Asia/Seoul')
+        scheduler.set_notification_channel('daily', 1, guild_id=10)
+        scheduler.set_notification_channel('daily', 2, guild_id=20)
+        assert len(task.slots) == 1
+        
+        scheduler.update_task_time('daily', 9, 30, guild_id=20)
+        assert len(task.slots) == 2
+        assert scheduler.get_task('daily', 20)['next_run'].astimezone(SEOUL).strftime('%H:%M') == '09:30'
+        assert scheduler.get_task('daily', 10)['next_run'].astimezone(SEOUL).strftime('%H:%M') == '08:00'
+        scheduler.stop_all()
+    
+    asyncio.run(run())
+
+def test_scheduler_guild_changes_only_touch_their_slots():
+    async def run():
+        scheduler = SchedulerService(FakeBot())
+        scheduler.start_all()
+        task = scheduler.add_task('daily', noop, hour=8, timezone='Asia/Seoul')
+        started = time.perf_counter()
+        for guild_id in range(1, 5001):
+            scheduler.set_notification_channel('daily', guild_id, guild_id=guild_id)
+            scheduler.set_guild_timezone(guild_id, 'America/New_York' if guild_id % 2 else 'Asia/Seoul')
+        assert time.perf_counter() - started < 2
+        assert sorted(len(members) for members in task.members.values()) == [2500, 2500]
+        assert len(task.slots) == 2
+        
+        # Leaving and rejoining a shared slot keeps the slot itself untouched
+        seoul = task.slots['08:00 Asia/Seoul']
+        scheduler.stop_task('daily', guild_id=2)
+        scheduler.start_task('daily', guild_id=2)
+        assert task.slots['08:00 Asia/Seoul'] is seoul
+        
+        # Its own time gets its own slot, dropped again once nobody uses it
+        scheduler.update_task_time('daily', 9, 30, guild_id=3)
+        assert '09:30 America/New_York' in task.slots
+        scheduler.update_task_time('daily', 8, 0, guild_id=3)
+        assert sorted(task.slots) == ['08:00 America/New_York', '08:00 Asia/Seoul']
+        assert len(live_entries(scheduler)) == 2
+        scheduler.stop_all()
+    
+    asyncio.run(run())
+
+def test_scheduler_remove_task_invalidates_its_entries():
+    async def run():
+        scheduler = SchedulerService(FakeBot())
+        scheduler.start_all()
+        scheduler.add_task('daily', noop, hour=8)
+        scheduler.add_task('other', noop, hour=9)
+        
+        scheduler.remove_task('daily')
+        assert not scheduler.has_task('daily')
+        assert [entry[3].task.name for entry in live_entries(scheduler)] == ['other']
+        scheduler.remove_task('daily')  # removing twice is harmless
+        scheduler.stop_all()
+    
+    asyncio.run(run())
+
+def test_scheduler_engine_exits_once_replaced():
+    async def run():
+        bot = FakeBot()
+        bot.ready.set()
+        scheduler = SchedulerService(bot)
+        scheduler.start_all()
+        engine, wakeup = scheduler._engine, scheduler._wakeup
+        await asyncio.sleep(0.01)  # idle on the empty heap
+        
+        # A cancel swallowed by wait_for leaves the old loop running; once it
+        # is no longer the current engine it must stop on its next wake-up
+        scheduler._engine = None
+        wakeup.set()
+        await asyncio.wait_for(engine, 1)
+        assert not engine.cancelled()
+        scheduler.stop_all()
+    
+    asyncio.run(run())
+
+def test_scheduler_fire_groups_channels_by_timezone():
+    async def run():
+        calls = []
+        
+        async def record(channels):
+            calls.append({timezone.zone: sorted(ids) for timezone, ids in channels.items()})
+        
+        bot = FakeBot()
+        scheduler = SchedulerService(bot)
+        scheduler.add_task('daily', record, hour=8, timezone='Asia/Seoul')
+        scheduler.set_notification_channel('daily', 1, guild_id=10)
+        scheduler.set_notification_channel('daily', 2, guild_id=20)
+        scheduler.set_guild_timezone(20, 'America/New_York')
+        scheduler.start_all()
+        
+        task = scheduler.tasks['daily']
+        await scheduler._execute(record, list(task.slots.values()))
+        assert calls == [{'Asia/Seoul': ['channel-1'], 'America/New_York': ['channel-2']}]
+        scheduler.stop_all()
+    
+    asyncio.run(run())
+
+# ScheduleRenderer
+
+def make_event(index: int, description: str = '') -> CalendarEvent:
+    start = SEOUL.localize(datetime(2025, 3, 1, 9, 0))
+    return CalendarEvent(f'event{index}', '', f'Event {index} ' + 'x' * 80, 'Room 101', description,
+                         start, start.replace(hour=10), SEOUL)
+
+def rendered_messages(renderer: ScheduleRenderer, count: int) -> list:
+    events = [make_event(index, 'd' * 101) for index in range(count)]
+    renderer.add_groups([(events[0].start_day, events)])
+    return renderer.finish()
+
+def test_renderer_respects_embed_limits():
+    renderer = ScheduleRenderer("📅 Today's Schedule")
+    messages = rendered_messages(renderer, 600)
+    assert len(messages) > 1
+    assert renderer.event_count == 600
+    for message in messages:
+        assert 1 <= len(message) <= EMBEDS_PER_MESSAGE
+        assert sum(len(title or '') + len(description) for title, description in message) <= EMBED_TOTAL_LIMIT
+        for title, description in message:
+            assert len(description) <= DESCRIPTION_LIMIT
+            assert title is None or len(title) <= TITLE_LIMIT
+
+def test_renderer_leaves_room_for_a_footer():
+    renderer = ScheduleRenderer("📅 Today's Schedule", footer_length=len(DEGRADED_NOTICE))
+    for message in rendered_messages(renderer, 600):
+        total = sum(len(title or '') + len(description) for title, description in message)
+        assert total + len(DEGRADED_NOTICE) <= EMBED_TOTAL_LIMIT
+
+def test_renderer_shows_times_in_the_given_timezone():
+    renderer = ScheduleRenderer("📅 Today's Schedule", timezone=NEW_YORK)
+    renderer.add_groups([(None, [make_event(0)])])
+    (message,) = renderer.finish()
+    assert '19:00 - 20:00' in message[0][1]  # 09:00 KST on the New York clock
+
+# ScheduleStore
+
+def read_rows(path: str) -> list[tuple]:
+    """Rows on disk, read through a separate connection ([] before the first write)"""
+    if not os.path.exists(path):
+        return []
+    with sqlite3.connect(path) as connection:
+        try:
+            return connection.execute(
+                'SELECT guild_id, task_name, channel_id, hour, minute, enabled, timezone '
+                'FROM schedule_settings ORDER BY guild_id, task_name'
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return []  # the store has not created its table yet
+
+def test_store_save_without_loop_writes_immediately(tmp_path):
+    path = str(tmp_path / 'schedules.db')
+    store = ScheduleStore(path)
+    store.save(None, 'daily', channel_id=5, hour=8)
+    assert read_rows(path) == [(0, 'daily', 5, 8, None, None, None)]
+    
+    # Later saves update only the columns they name
+    store.save(None, 'daily', minute=30)
+    assert read_rows(path) == [(0, 'daily', 5, 8, 30, None, None)]
+    assert store.load() == [{'guild_id': None, 'task_name': 'daily', 'channel_id': 5, 'hour': 8,
+                             'minute': 30, 'enabled': None, 'timezone': None}]
+
+def test_store_rejects_unknown_columns(tmp_path):
+    store = ScheduleStore(str(tmp_path / 'schedules.db'))
+    try:
+        store.save(1, 'daily', colour='blue')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('unknown column accepted')
+
+def test_store_batches_saves_and_flushes_on_close(tmp_path):
+    path = str(tmp_path / 'schedules.db')
+    
+    async def run():
+        store = ScheduleStore(path, flush_delay=60)
+        store.save(1, 'daily', channel_id=10)
+        store.save(1, 'daily', enabled=1)
+        store.save(2, '', timezone='UTC')
+        assert read_rows(path) == []  # still queued
+        await store.close()
+    
+    asyncio.run(run())
+    assert read_rows(path) == [(1, 'daily', 10, None, None, 1, None), (2, '', None, None, None, None, 'UTC')]
+
+def test_store_keeps_saves_made_during_a_flush(tmp_path):
+    path = str(tmp_path / 'schedules.db')
+    
+    async def run():
+        store = ScheduleStore(path, flush_delay=0)
+        loop = asyncio.get_running_loop()
+        write = store._write
+        
+        def slow_write(pending):
+            # Save again on the loop while the first snapshot is being written
+            store._write = write
+            loop.call_soon_threadsafe(lambda: store.save(2, 'daily', channel_id=20))
+            time.sleep(0.05)
+            write(pending)
+        
+        store._write = slow_write
+        store.save(1, 'daily', channel_id=10)
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if len(read_rows(path)) == 2:
+                break
+        # Written by the running flush, not left for close()
+        assert len(read_rows(path)) == 2
+        await store.close()
+    
+    asyncio.run(run())
+    assert read_rows(path) == [(1, 'daily', 10, None, None, None, None), (2, 'daily', 20, None, None, None, None)]
+
+# CalendarSource sync
+
+class FakeCalendarClient:
+    """
+    Stands in for CalendarApiClient: answers full syncs with the given events
+    and incremental syncs with no changes, unless told to fail or hold
+    """
+    
+    def __init__(self, events: list[dict]):
+        self.events = events
+        self.requests: list[dict] = []
+        self.token_error: Exception | None = None
+        self.full_sync_error: Exception | None = None
+        self.full_sync_gate: asyncio.Event | None = None
+        self.broken_calendars: set[str] = set()
+    
+    async def iter_event_pages(self, calendar_id: str, **params):
+        self.requests.append(params)
+        if calendar_id in self.broken_calendars:
+            raise CalendarApiError(404, 'Not Found')
+        if 'syncToken' in params:
+            if self.token_error:
+                raise self.token_error
+            yield {'items': [], 'nextSyncToken': params['syncToken']}
+            return
+        if self.full_sync_gate:
+            await self.full_sync_gate.wait()
+        if self.full_sync_error:
+            raise self.full_sync_error
+        yield {'items': self.events, 'nextSyncToken': 'token'}
+    
+    async def close(self):
+        pass
+
+def api_event(event_id: str, start: datetime, hours: float = 1, summary: str | None = None) -> dict:
+    """A Calendar API event resource"""
+    return {
+        'id': event_id,
+        'status': 'confirmed',
+        'summary': summary or f'Event {event_id}',
+        'start': {'dateTime': start.isoformat()},
+        'end': {'dateTime': (start + timedelta(hours=hours)).isoformat()},
+    }
+
+def today_at(hour: int, timezone=SEOUL) -> datetime:
+    """An aware time today on the timezone's clock"""
+    return timezone.localize(datetime.combine(datetime.now(timezone).date(), datetime.min.time().replace(hour=hour)))
+
+def make_service(monkeypatch, client, calendars: str = 'Team=team@example.com', **env):
+    """A GoogleCalendarService on the fake client, always due for a refresh"""
+    monkeypatch.setenv('GOOGLE_API_KEY', 'key')
+    monkeypatch.setenv('GOOGLE_CALENDAR_IDS', calendars)
+    monkeypatch.setenv('TIMEZONE', 'Asia/Seoul')
+    monkeypatch.setenv('CALENDAR_SYNC_INTERVAL', '0')
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    service = GoogleCalendarService()
+    service.client = client
+    return service
+
+def titles(groups) -> list[str]:
+    return [event.title for _, events in groups for event in events]
+
+def test_incremental_sync_applies_changes_and_cancellations(monkeypatch):
+    client = FakeCalendarClient([api_event('a', today_at(10)), api_event('b', today_at(11))])
+    service = make_service(monkeypatch, client)
+    source = service.sources[0]
+    
+    async def run():
+        assert await source.sync(client) == 'full'
+        version = source.store.version
+        
+        changes = [api_event('a', today_at(15), summary='Moved'), {'id': 'b', 'status': 'cancelled'}]
+        original = client.iter_event_pages
+        
+        async def delta(calendar_id, **params):
+            client.requests.append(params)
+            yield {'items': changes, 'nextSyncToken': 'token2'}
+        
+        client.iter_event_pages = delta
+        assert await source.sync(client) == 'incremental'
+        client.iter_event_pages = original
+        
+        assert client.requests[-1] == {'singleEvents': True, 'maxResults': 2500, 'syncToken': 'token'}
+        assert source.store.sync_token == 'token2'
+        assert source.store.version == version + 1
+        assert [event.title for event in source.store.events.values()] == ['Moved']
+    
+    asyncio.run(run())
+
+def test_expired_sync_token_keeps_serving_stored_events(monkeypatch):
+    client = FakeCalendarClient([api_event('a', today_at(12), summary='Standup')])
+    service = make_service(monkeypatch, client, CALENDAR_REFRESH_DEADLINE='0.05')
+    
+    async def run():
+        await service.sync()
+        client.events = [api_event('b', today_at(13), summary='Review')]
+        client.token_error = CalendarApiError(410, 'Sync token is no longer valid')
+        client.full_sync_gate = asyncio.Event()
+        
+        # The resync outlasts the query's deadline: the old copy answers meanwhile
+        assert titles(await service.get_events_by_day(0)) == ['Standup']
+        assert not service.degraded
+        
+        client.full_sync_gate.set()
+        await asyncio.sleep(0.05)
+        assert titles(await service.get_events_by_day(0)) == ['Review']
+        assert 'timeMin' in client.requests[-1] and not service.sources[0].store.token_expired
+        await service.close()
+    
+    asyncio.run(run())
+
+def test_failed_resync_after_expired_token_serves_last_good_copy(monkeypatch):
+    client = FakeCalendarClient([api_event('a', today_at(12), summary='Standup')])
+    service = make_service(monkeypatch, client)
+    
+    async def run():
+        await service.sync()
+        client.token_error = CalendarApiError(410, 'Sync token is no longer valid')
+        client.full_sync_error = CalendarApiError(503, 'Backend Error')
+        
+        assert titles(await service.get_events_by_day(0)) == ['Standup']
+        assert service.degraded
+        
+        # The next sync goes straight to a full sync, not the rejected token
+        client.requests.clear()
+        client.full_sync_error = None
+        await service.sync()
+        assert [('syncToken' in params) for params in client.requests] == [False]
+        assert not service.degraded
+        await service.close()
+    
+    asyncio.run(run())
+
+async def entry_stream(*pages, fail: Exception | None = None, hang: bool = False):
+    """An ordered stream of (date, start, label, title) pages that may fail or stall at the end"""
+    for page in pages:
+        yield page
+    if fail:
+        raise fail
+    if hang:
+        await asyncio.sleep(60)
+
+def test_merge_streams_drops_failing_calendars_and_keeps_order(monkeypatch):
+    service = make_service(monkeypatch, FakeCalendarClient([]), CALENDAR_FETCH_TIMEOUT='0.05')
+    today = today_at(0).date()
+    tomorrow = today + timedelta(days=1)
+    
+    def entry(day, hour, label):
+        return (day, today_at(hour), label, f'{label} {hour}')
+    
+    streams = [
+        entry_stream([entry(today, 9, 'A'), entry(today, 12, 'A')], [entry(tomorrow, 9, 'A')]),
+        entry_stream([entry(today, 10, 'B')], fail=CalendarApiError(503, 'Backend Error')),
+        entry_stream([entry(today, 11, 'C')], hang=True),
+    ]
+    
+    async def run():
+        errors = []
+        batches = [batch async for batch in service._merge_streams(streams, errors)]
+        return batches, errors
+    
+    batches, errors = asyncio.run(run())
+    merged = [entry[3] for batch in batches for entry in batch]
+    assert merged == ['A 9', 'B 10', 'C 11', 'A 12', 'A 9']
+    assert [type(error) for error in errors] == [CalendarApiError, asyncio.TimeoutError]
+
+def test_one_failing_calendar_does_not_hide_the_others(monkeypatch):
+    client = FakeCalendarClient([api_event('a', today_at(12), summary='Standup')])
+    client.broken_calendars.add('gone@example.com')
+    service = make_service(monkeypatch, client, calendars='Team=team@example.com,Gone=gone@example.com')
+    
+    async def run():
+        assert titles(await service.get_events_by_day(0)) == ['Standup']
+        assert service.degraded
+        
+        client.broken_calendars.clear()
+        await service.sync()
+        assert not service.degraded
+        await service.close()
+    
+    asyncio.run(run())
+
+def test_streamed_in_progress_events_go_under_the_first_day(monkeypatch):
+    late_night = api_event('a', today_at(22) - timedelta(days=1), hours=4, summary='Deploy')
+    client = FakeCalendarClient([late_night, api_event('b', today_at(9))])
+    source = make_service(monkeypatch, client).sources[0]
+    start = today_at(0)
+    
+    async def run():
+        return [entry async for page in source.stream_by_day(client, start, start + timedelta(days=1)) for entry in page]
+    
+    today = start.date()
+    assert [(day, event.title) for day, _, event in asyncio.run(run())] == [(today, 'Deploy'), (today, 'Event b')]
+
+# DayIndex
+
+def all_day_event(event_id: str, first: date, days: int = 1) -> dict:
+    """A Calendar API all-day event resource; the end date is exclusive"""
+    return {
+        'id': event_id,
+        'summary': f'Event {event_id}',
+        'start': {'date': first.isoformat()},
+        'end': {'date': (first + timedelta(days=days)).isoformat()},
+    }
+
+def test_day_index_files_multi_day_and_all_day_events():
+    day = date(2025, 3, 10)
+    
+    def at(hour: int, offset: int = 0) -> datetime:
+        return SEOUL.localize(datetime.combine(day + timedelta(days=offset), datetime.min.time().replace(hour=hour)))
+    
+    events = [
+        CalendarEvent.from_api(event, SEOUL) for event in (
+            all_day_event('trip', day - timedelta(days=1), days=3),
+            all_day_event('holiday', day + timedelta(days=1)),
+            api_event('overnight', at(22), hours=4),
+            api_event('meeting', at(10, 1)),
+        )
+    ]
+    index = DayIndex(SEOUL, window_days=7)
+    index.rebuild(reversed(events), version=1, today=day)
+    assert index.is_current(1, day) and not index.is_current(2, day)
+    assert index.covers(day, 7) and not index.covers(day, 8)
+    
+    def keyed(first_offset, last_offset):
+        """(day offset, event id) entries of a slice between two midnights"""
+        return [((entry_day - day).days, event.id)
+                for entry_day, _, event in index.slice(at(0, first_offset), at(0, last_offset))]
+    
+    # Every event once, under the first day of the range it covers
+    assert keyed(0, 3) == [(0, 'trip'), (0, 'overnight'), (1, 'holiday'), (1, 'meeting')]
+    # Events carried over from earlier days go under the range's first day, in start order
+    assert keyed(1, 2) == [(1, 'trip'), (1, 'overnight'), (1, 'holiday'), (1, 'meeting')]
+    # End dates are exclusive: nothing spills into the day after
+    assert keyed(2, 3) == []
+
+# Calendar API quota
+
+class FakeErrorResponse:
+    """Stands in for an aiohttp error response"""
+    
+    def __init__(self, status: int, body: dict, headers: dict | None = None):
+        self.status = status
+        self.reason = 'Error'
+        self.headers = headers or {}
+        self.body = body
+    
+    async def json(self, content_type=None):
+        return self.body
+
+def rate_limit_body(reason: str) -> dict:
+    return {'error': {'code': 403, 'message': 'Request denied', 'errors': [{'reason': reason}]}}
+
+def make_quota(**kwargs) -> QuotaManager:
+    options = {'rate': 1000, 'burst': 100, 'max_retries': 3, 'backoff_base': 0.001, 'backoff_max': 1,
+               'breaker': CircuitBreaker(2, 60)}
+    options.update(kwargs)
+    return QuotaManager(**options)
+
+def failing(*errors, result='ok'):
+    """A request raising the given errors in turn, then returning result"""
+    calls = []
+    
+    async def request():
+        calls.append(time.monotonic())
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+    
+    return request, calls
+
+def test_api_error_carries_the_error_reason():
+    async def run():
+        client = CalendarApiClient('key')
+        error = await client._error_from_response(
+            FakeErrorResponse(403, rate_limit_body('userRateLimitExceeded'), {'Retry-After': '7'}))
+        assert (error.status, error.reason, error.retry_after) == (403, 'userRateLimitExceeded', 7.0)
+        assert is_retryable(error)
+        
+        error = await client._error_from_response(FakeErrorResponse(403, rate_limit_body('forbidden')))
+        assert error.reason == 'forbidden' and not is_retryable(error)
+        # The message alone no longer decides: only the reason does
+        assert not is_retryable(CalendarApiError(403, 'Rate limit exceeded'))
+    
+    asyncio.run(run())
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after('120') == 120.0
+    assert 28 <= parse_retry_after(formatdate(time.time() + 30, usegmt=True)) <= 30
+    assert parse_retry_after(formatdate(utc(2020, 1, 1).timestamp(), usegmt=True)) == 0.0
+    assert parse_retry_after('soon') is None and parse_retry_after(None) is None
+
+def test_quota_retries_transient_errors_then_succeeds():
+    quota = make_quota()
+    request, calls = failing(CalendarApiError(503, 'Backend Error'), CalendarApiError(429, 'Too Many Requests'))
+    assert asyncio.run(quota.call(request)) == 'ok'
+    assert len(calls) == 3 and quota.breaker.failures == 0
+    
+    # Not worth retrying: one attempt, and the API answering counts as healthy
+    request, calls = failing(CalendarApiError(404, 'Not Found'))
+    try:
+        asyncio.run(quota.call(request))
+    except CalendarApiError as e:
+        assert e.status == 404
+    assert len(calls) == 1 and not quota.breaker.is_open
+
+def test_quota_waits_for_retry_after():
+    quota = make_quota()
+    request, calls = failing(CalendarApiError(429, 'Too Many Requests', retry_after=0.05))
+    assert asyncio.run(quota.call(request)) == 'ok'
+    assert calls[1] - calls[0] >= 0.05
+    
+    # Asked to wait longer than backoff_max: give up now instead of sleeping
+    request, calls = failing(CalendarApiError(429, 'Too Many Requests', retry_after=5))
+    try:
+        asyncio.run(quota.call(request))
+    except CalendarApiError:
+        pass
+    assert len(calls) == 1 and quota.breaker.failures == 1
+
+def test_circuit_breaker_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.is_open
+    
+    def rejected() -> bool:
+        try:
+            breaker.allow()
+        except CircuitOpenError:
+            return True
+        return False
+    
+    assert rejected()
+    time.sleep(0.06)
+    assert not rejected()  # the trial call
+    assert rejected()  # everyone else, while the trial is out
+    breaker.record_failure()
+    assert rejected()
+    
+    time.sleep(0.06)
+    assert not rejected()
+    breaker.record_success()
+    assert not breaker.is_open and not rejected()
+
+# Logging
+
+def test_bot_modules_log_instead_of_printing():
+    # print blocks the event loop on a slow stdout and skips the queued log handler
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bot')
+    offenders = []
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if not name.endswith('.py'):
+                continue
+            path = os.path.join(directory, name)
+            with open(path, encoding='utf-8') as file:
+                tree = ast.parse(file.read(), path)
+            offenders += [f"{os.path.relpath(path, root)}:{node.lineno}" for node in ast.walk(tree)
+                          if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'print']
+    assert offenders == []
+
+# SingleFlight
+
+def test_single_flight_shares_one_call_per_key():
+    async def run():
+        flight = SingleFlight('test')
+        calls = []
+        gate = asyncio.Event()
+        
+        async def fetch(key):
+            calls.append(key)
+            await gate.wait()
+            return f'result-{key}'
+        
+        waiting = [asyncio.create_task(flight.do(key, lambda key=key: fetch(key))) for key in ('a', 'a', 'b')]
+        await asyncio.sleep(0.01)
+        assert flight.in_flight('a') and calls == ['a', 'b']
+        gate.set()
+        assert await asyncio.gather(*waiting) == [('result-a', False), ('result-a', True), ('result-b', False)]
+        
+        # Nothing is cached: the next caller starts a new call
+        assert not flight.in_flight('a')
+        assert await flight.do('a', lambda: fetch('a')) == ('result-a', False)
+        assert calls == ['a', 'b', 'a']
+    
+    asyncio.run(run())
+
+def test_single_flight_survives_a_cancelled_caller_and_shares_errors():
+    async def run():
+        flight = SingleFlight('test')
+        gate = asyncio.Event()
+        
+        async def fetch():
+            await gate.wait()
+            raise CalendarApiError(503, 'Backend Error')
+        
+        first = asyncio.create_task(flight.do('a', fetch))
+        second = asyncio.create_task(flight.do('a', fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert flight.in_flight('a')  # the caller gave up, the call did not
+        
+        gate.set()
+        try:
+            await second
+        except CalendarApiError as e:
+            assert e.status == 503
+        else:
+            raise AssertionError('the shared error was not raised')
+        assert first.cancelled() and not flight.in_flight('a')
+    
+    asyncio.run(run())
+
+# AdmissionController
+
+def command_context(user_id: int, channel_id: int = 100, guild_id: int = 1000):
+    """Just enough of a commands.Context for the cooldown buckets"""
+    message = SimpleNamespace(author=SimpleNamespace(id=user_id), channel=SimpleNamespace(id=channel_id),
+                              guild=SimpleNamespace(id=guild_id))
+    return SimpleNamespace(message=message)
+
+def rate_limited(controller: AdmissionController, ctx) -> bool:
+    try:
+        controller.check_rate(ctx)
+    except commands.CommandOnCooldown:
+        return True
+    return False
+
+def test_admission_rate_limits_every_scope():
+    controller = AdmissionController(limits={'user': (2, 60), 'guild': (3, 60)})
+    assert not rate_limited(controller, command_context(1))
+    assert not rate_limited(controller, command_context(1))
+    assert rate_limited(controller, command_context(1))
+    # The rejected command took no guild token, so one more user still fits
+    assert not rate_limited(controller, command_context(2))
+    assert rate_limited(controller, command_context(3))
+    assert not rate_limited(controller, command_context(3, guild_id=2000))
+    assert parse_limit('5/30') == (5, 30.0) and parse_limit('0') is None and parse_limit('') is None
+
+def test_admission_queues_then_rejects_when_full():
+    async def run():
+        controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0.01)
+        assert controller.waiting == 1
+        
+        # Queue full: turned away without waiting
+        try:
+            await controller.acquire()
+        except AdmissionRejected:
+            pass
+        else:
+            raise AssertionError('a full queue admitted a command')
+        
+        controller.release()
+        await waiter
+        assert controller.waiting == 0
+        
+        # Queued too long: turned away after queue_timeout
+        try:
+            await controller.acquire()
+        except AdmissionRejected:
+            pass
+        else:
+            raise AssertionError('a command waited past queue_timeout')
+        controller.release()
+        await asyncio.wait_for(controller.acquire(), 1)
+    
+    asyncio.run(run())
+
+def test_admission_reject_policy_never_queues():
+    async def run():
+        controller = AdmissionController(max_concurrent=1, policy='reject')
+        await controller.acquire()
+        try:
+            await controller.acquire()
+        except AdmissionRejected:
+            pass
+        else:
+            raise AssertionError('the reject policy queued a command')
+        assert controller.waiting == 0
+    
+    asyncio.run(run())
+    try:
+        AdmissionController(policy='drop')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('an unknown policy was accepted')
+
+# Authorizer
+
+def member(user_id: int, *role_ids: int):
+    return SimpleNamespace(id=user_id, roles=[SimpleNamespace(id=role_id) for role_id in role_ids])
+
+def write_authorization(path, config, mtime: float):
+    """Write the authorization file with an explicit mtime, so changes are seen within one test"""
+    path.write_text(config if isinstance(config, str) else json.dumps(config), encoding='utf-8')
+    os.utime(path, (mtime, mtime))
+
+def test_authorizer_applies_guild_overrides(monkeypatch, tmp_path):
+    monkeypatch.setenv('AUTHORIZED_USERS', '1')
+    monkeypatch.setenv('AUTHORIZED_ROLES', '50')
+    path = tmp_path / 'authorization.json'
+    write_authorization(path, {
+        'users': [2],
+        'guilds': {
+            '10': {'users': [3]},
+            '20': {'users': [4], 'roles': [60], 'inherit': False},
+        },
+    }, 1000)
+    authorizer = Authorizer(str(path), reload_interval=0)
+    
+    assert authorizer.is_authorized(member(1)) and authorizer.is_authorized(member(2))
+    assert authorizer.is_authorized(member(9, 50))
+    # An inheriting override adds to the global entries inside its guild only
+    assert authorizer.is_authorized(member(3), guild_id=10) and not authorizer.is_authorized(member(3))
+    assert authorizer.is_authorized(member(1), guild_id=10) and authorizer.is_authorized(member(9, 50), guild_id=10)
+    # "inherit": false replaces them
+    assert not authorizer.is_authorized(member(1), guild_id=20)
+    assert not authorizer.is_authorized(member(9, 50), guild_id=20)
+    assert authorizer.is_authorized(member(4), guild_id=20) and authorizer.is_authorized(member(9, 60), guild_id=20)
+
+def test_authorizer_reloads_on_change_and_keeps_the_last_good_index(monkeypatch, tmp_path):
+    monkeypatch.setenv('AUTHORIZED_USERS', '1')
+    monkeypatch.delenv('AUTHORIZED_ROLES', raising=False)
+    path = tmp_path / 'authorization.json'
+    
+    # No file yet: the environment settings still apply
+    authorizer = Authorizer(str(path), reload_interval=0)
+    assert authorizer.is_authorized(member(1)) and not authorizer.is_authorized(member(2))
+    
+    write_authorization(path, {'users': [2]}, 1000)
+    assert authorizer.is_authorized(member(2))
+    write_authorization(path, {'users': [3]}, 2000)
+    assert authorizer.is_authorized(member(3)) and not authorizer.is_authorized(member(2))
+    
+    # A broken edit keeps the previous index instead of locking everyone out
+    write_authorization(path, '{"users": [', 3000)
+    assert authorizer.is_authorized(member(3)) and authorizer.is_authorized(member(1))
+
+# RenderCache
+
+def test_render_cache_evicts_least_recently_used_views():
+    cache = RenderCache(max_entries=2)
+    cache.put(1, ('today', 'a'), ['a'])
+    cache.put(1, ('today', 'b'), ['b'])
+    assert cache.get(1, ('today', 'a')) == ['a']
+    cache.put(1, ('today', 'c'), ['c'])
+    assert cache.get(1, ('today', 'b')) is None
+    assert cache.get(1, ('today', 'a')) == ['a'] and cache.get(1, ('today', 'c')) == ['c']
+    
+    # A new calendar version drops everything rendered from the old events
+    assert cache.get(2, ('today', 'a')) is None and len(cache) == 0
+
+def test_render_cache_follows_calendar_changes(monkeypatch):
+    client = FakeCalendarClient([api_event('a', today_at(12), summary='Standup')])
+    service = make_service(monkeypatch, client)
+    tasks = CalendarTasks(service)
+    
+    async def run():
+        first = await tasks._daily_embeds()
+        assert await tasks._daily_embeds() is first
+        # Each timezone is its own view
+        assert await tasks._daily_embeds(NEW_YORK) is not first
+        assert len(tasks.render_cache) == 2
+        
+        service.sources[0].store.apply_changes([api_event('b', today_at(13), summary='Review')], 'token2')
+        changed = await tasks._daily_embeds()
+        assert changed is not first and len(tasks.render_cache) == 1
+        assert await tasks._daily_embeds() is changed
+        await service.close()
+    
+    asyncio.run(run())